@@ -0,0 +1,43 @@
+"""
+Decodificación de imágenes y marcas de agua compartida por el editor y el slideshow
+"""
+from functools import lru_cache
+
+import numpy as np
+from PySide6.QtCore import Signal, QObject, QRunnable
+
+from WatermarkRemove.wm_remove import load_images_cv2
+
+
+@lru_cache(maxsize=8)
+def load_watermark_cached(watermark_path: str) -> np.ndarray:
+    """
+    Decodifica una marca de agua recordando las últimas usadas
+
+    El editor y el slideshow comparten esta caché: recorrer el ComboBox de marcas
+    o redibujar los cuadros de posiciones no vuelve a decodificar los PNG.
+    El array devuelto es compartido: no se debe modificar.
+    """
+    return load_images_cv2(watermark_path)
+
+
+class DecodeSignals(QObject):
+    """Señales de DecodeTask (QRunnable no es QObject y no puede emitir)"""
+
+    finished = Signal(str, object)  # ruta, ndarray BGR (None si falló)
+
+
+class DecodeTask(QRunnable):
+    """Decodifica una imagen con load_images_cv2 en un hilo del QThreadPool"""
+
+    def __init__(self, image_path: str, signals: DecodeSignals):
+        super().__init__()
+        self.image_path = image_path
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = load_images_cv2(self.image_path)
+        except Exception:
+            image = None
+        self.signals.finished.emit(self.image_path, image)
@@ -3,14 +3,21 @@ Visor de imágenes para mostrar todas las imágenes de una carpeta
 """
 import os
 import sys
+import hashlib
 from pathlib import Path
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QScrollArea, QWidget, QGridLayout, QApplication
+    QLabel, QScrollArea, QListView, QApplication
+)
+from PySide6.QtCore import (
+    Qt, QSize, QPoint, QTimer, QObject, QRunnable, QThread, QThreadPool, Signal,
+    QStandardPaths, QAbstractListModel, QModelIndex
+)
+from PySide6.QtGui import (
+    QPixmap, QImage, QImageReader, QImageWriter, QPixmapCache, QPainter, QColor
 )
-from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QPixmap
 from natsort import natsorted
+from psd_tools import PSDImage
 # Agregar el directorio raíz al path
 current_dir = os.path.abspath(os.path.dirname(__file__))
 parent_dir = os.path.dirname(os.path.dirname(current_dir))
@@ -18,18 +25,452 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 
+# Formato de la caché de miniaturas en disco: WEBP con pérdida ocupa ~10 veces
+# menos que PNG; si el plugin de WEBP no está disponible se usa PNG
+THUMB_CACHE_FORMAT = 'webp' if b'webp' in QImageWriter.supportedImageFormats() else 'png'
+THUMB_CACHE_QUALITY = 80 if THUMB_CACHE_FORMAT == 'webp' else -1
+
+
+def _thumb_cache_path(cache_dir: Path, image_path: Path, mtime_ns: int, size: int) -> Path:
+    """
+    Retorna la ruta de la miniatura cacheada en disco para una imagen
+
+    La clave incluye la fecha de modificación y el tamaño de miniatura, así que
+    si el archivo cambia se genera una entrada nueva.
+    """
+    key = hashlib.sha1(f"{image_path.absolute()}|{mtime_ns}|{size}".encode('utf-8')).hexdigest()
+    return cache_dir / key[:2] / f"{key}.{THUMB_CACHE_FORMAT}"
+
+
+PHOTOSHOP_SUFFIXES = ('.psd', '.psb')
+
+# IDs de Image Resources de Photoshop que contienen una miniatura JPEG
+# (1036 = RGB, 1033 = formato antiguo de Photoshop 4 con canales BGR)
+PSD_THUMBNAIL_RESOURCES = (1036, 1033)
+
+
+def _load_psd_preview(image_path: Path) -> QImage:
+    """
+    Lee la miniatura JPEG incrustada en un PSD/PSB sin decodificar el documento
+
+    Recorre la cabecera y la sección "Image Resources" buscando los recursos
+    1036/1033. Retorna una QImage nula si el archivo no tiene miniatura.
+    """
+    thumbnails = {}
+    with open(image_path, 'rb') as file:
+        header = file.read(26)
+        if len(header) < 26 or header[:4] != b'8BPS':
+            return QImage()
+
+        # Color Mode Data (se omite)
+        color_mode_length = int.from_bytes(file.read(4), 'big')
+        file.seek(color_mode_length, os.SEEK_CUR)
+
+        resources_length = int.from_bytes(file.read(4), 'big')
+        resources_end = file.tell() + resources_length
+
+        while file.tell() + 12 <= resources_end:
+            if file.read(4) != b'8BIM':
+                break
+            resource_id = int.from_bytes(file.read(2), 'big')
+
+            # Nombre como Pascal string, con relleno a longitud par
+            name_length = file.read(1)[0]
+            file.seek(name_length + (name_length + 1) % 2, os.SEEK_CUR)
+
+            data_length = int.from_bytes(file.read(4), 'big')
+            if resource_id in PSD_THUMBNAIL_RESOURCES:
+                thumbnails[resource_id] = file.read(data_length)
+                file.seek(data_length % 2, os.SEEK_CUR)
+            else:
+                file.seek(data_length + data_length % 2, os.SEEK_CUR)
+
+    for resource_id in PSD_THUMBNAIL_RESOURCES:
+        data = thumbnails.get(resource_id)
+        if not data or len(data) <= 28:
+            continue
+        # 28 bytes de cabecera (formato, dimensiones, tamaños...) seguidos del JFIF
+        image = QImage.fromData(data[28:], 'JPG')
+        if image.isNull():
+            continue
+        return image.rgbSwapped() if resource_id == 1033 else image
+
+    return QImage()
+
+
+def _load_psd_full(image_path: Path) -> QImage:
+    """Decodifica la imagen compuesta de un PSD/PSB con psd_tools (lento)"""
+    pil_image = PSDImage.open(image_path).topil().convert('RGBA')
+    width, height = pil_image.size
+    data = pil_image.tobytes('raw', 'RGBA')
+    return QImage(data, width, height, 4 * width, QImage.Format.Format_RGBA8888).copy()
+
+
+class DirScanWorker(QObject):
+    """
+    Lista las imágenes de una carpeta en un QThread propio
+
+    En carpetas de red o discos lentos el listado puede tardar segundos; así
+    no bloquea la GUI.
+    """
+
+    found = Signal(int, object)  # token, [(ruta, mtime_ns)]
+
+    def __init__(self, extensions: frozenset):
+        super().__init__()
+        self.extensions = extensions  # Extensiones sin punto, en minúsculas
+
+    def scan(self, token: int, folder: str):
+        """
+        Lista la carpeta y emite ``found`` con las imágenes en orden natural
+
+        Args:
+            token: Identificador del escaneo; el visor descarta resultados viejos
+            folder: Carpeta a listar
+        """
+        # os.scandir reutiliza el tipo de archivo que entrega el sistema al listar
+        # (sin un stat por archivo). Se guarda el mtime junto a la ruta para la
+        # clave de la caché de miniaturas.
+        try:
+            with os.scandir(folder) as it:
+                entries = [
+                    entry for entry in it
+                    if entry.is_file(follow_symlinks=False)
+                    and entry.name.rpartition('.')[2].lower() in self.extensions
+                ]
+            entries = natsorted(entries, key=lambda entry: entry.name)
+            image_files = [(Path(entry.path), entry.stat().st_mtime_ns) for entry in entries]
+        except OSError:
+            image_files = []
+
+        self.found.emit(token, image_files)
+
+
+class ThumbModel(QAbstractListModel):
+    """
+    Modelo de miniaturas para el QListView: una fila por imagen
+
+    La decoración se resuelve de forma diferida: el QListView solo pide
+    ``DecorationRole`` de las filas que pinta, y el modelo emite
+    ``thumbnailRequested`` para que el visor decodifique esa fila en segundo
+    plano. Mientras tanto se muestra un placeholder gris.
+    """
+
+    thumbnailRequested = Signal(int)  # fila
+
+    def __init__(self, thumbnail_size: int, parent=None):
+        super().__init__(parent)
+        self.thumbnail_size = thumbnail_size
+        self._files = []  # [(Path, mtime_ns)]
+        self._requested = set()  # Filas con decodificación en curso
+        self._previews = {}  # fila -> QPixmap rápida (antes de la pasada suave)
+        self._stubs = set()  # PSD sin miniatura incrustada (se decodifican al hacer click)
+        self._errors = set()  # Filas que no se pudieron decodificar
+
+        self._placeholder = self._make_placeholder("", "#f0f0f0", "#cccccc")
+        self._stub_pixmap = self._make_placeholder("PSD\n\nClick para\ncargar", "#f0f0f0", "#cccccc")
+        self._error_pixmap = self._make_placeholder("Error\ncargando\nimagen", "#ffeeee", "#ff0000")
+
+    def _make_placeholder(self, text: str, background: str, border: str) -> QPixmap:
+        """Dibuja un pixmap del tamaño de la miniatura con borde y texto centrado"""
+        pixmap = QPixmap(self.thumbnail_size, self.thumbnail_size)
+        pixmap.fill(QColor(background))
+        painter = QPainter(pixmap)
+        painter.setPen(QColor(border))
+        painter.drawRect(0, 0, self.thumbnail_size - 1, self.thumbnail_size - 1)
+        if text:
+            painter.setPen(QColor("#666666"))
+            painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, text)
+        painter.end()
+        return pixmap
+
+    def set_files(self, image_files: list):
+        """Reemplaza la lista de imágenes: [(ruta, mtime_ns)]"""
+        self.beginResetModel()
+        self._files = list(image_files)
+        self._requested.clear()
+        self._previews.clear()
+        self._stubs.clear()
+        self._errors.clear()
+        self.endResetModel()
+
+    def file_at(self, row: int) -> tuple:
+        """Retorna (ruta, mtime_ns) de una fila"""
+        return self._files[row]
+
+    def cache_key(self, row: int) -> str:
+        """Clave de QPixmapCache para la miniatura de una fila"""
+        image_path, mtime_ns = self._files[row]
+        return f"{image_path}|{mtime_ns}|{self.thumbnail_size}"
+
+    def is_requested(self, row: int) -> bool:
+        return row in self._requested
+
+    def is_stub(self, row: int) -> bool:
+        return row in self._stubs
+
+    def mark_requested(self, row: int):
+        self._requested.add(row)
+
+    def unmark_requested(self, row: int):
+        """La fila se vuelve a pedir la próxima vez que se pinte"""
+        self._requested.discard(row)
+
+    def set_thumbnail(self, row: int, pixmap: QPixmap, final: bool):
+        """
+        Instala la miniatura de una fila
+
+        La versión final se guarda en QPixmapCache (LRU); si se desaloja, la
+        fila se vuelve a pedir y se resuelve desde la caché de disco.
+        """
+        if final:
+            QPixmapCache.insert(self.cache_key(row), pixmap)
+            self._previews.pop(row, None)
+            self._requested.discard(row)
+        else:
+            self._previews[row] = pixmap
+        self._emit_decoration_changed(row)
+
+    def set_stub(self, row: int):
+        self._stubs.add(row)
+        self._emit_decoration_changed(row)
+
+    def clear_stub(self, row: int):
+        self._stubs.discard(row)
+
+    def set_error(self, row: int):
+        self._errors.add(row)
+        self._emit_decoration_changed(row)
+
+    def _emit_decoration_changed(self, row: int):
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._files)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        image_path, _ = self._files[row]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return image_path.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return str(image_path)
+        if role == Qt.ItemDataRole.DecorationRole:
+            if row in self._errors:
+                return self._error_pixmap
+            if row in self._stubs:
+                return self._stub_pixmap
+
+            pixmap = QPixmapCache.find(self.cache_key(row))
+            if pixmap is not None:
+                return pixmap
+            if row in self._previews:
+                return self._previews[row]
+            if row not in self._requested:
+                self._requested.add(row)
+                self.thumbnailRequested.emit(row)
+            return self._placeholder
+        return None
+
+
+class ThumbSignals(QObject):
+    """Señales de los workers de miniaturas (viven en el hilo de la GUI)"""
+
+    # (thumb_id, miniatura escalada o QImage nula si falló, es la versión final suavizada)
+    finished = Signal(int, QImage, bool)
+    # La tarea terminó de ejecutarse (también si estaba cancelada) y se puede soltar
+    released = Signal(object)
+
+
+class ThumbTask(QRunnable):
+    """
+    Decodifica y escala una miniatura en un hilo del QThreadPool
+
+    Usa QImage (seguro entre hilos); la conversión a QPixmap se hace en la GUI.
+    Si la miniatura ya está en la caché de disco se lee de ahí en lugar de
+    decodificar el original.
+
+    La carga se hace en dos pasadas: la primera decodifica una imagen intermedia
+    (``source``) y emite una versión rápida (FastTransformation); la segunda,
+    con ``source`` ya decodificada, emite la versión suavizada y la guarda en la
+    caché de disco.
+    """
+
+    def __init__(self, thumb_id: int, image_path: Path, size: int, signals: ThumbSignals,
+                 cache_file: Path = None, source: QImage = None, full_decode: bool = False):
+        super().__init__()
+        self.thumb_id = thumb_id
+        self.image_path = image_path
+        self.size = size
+        self.signals = signals
+        self.cache_file = cache_file
+        self.source = source  # Imagen intermedia; si existe, esta tarea es la pasada suave
+        self.full_decode = full_decode  # PSD/PSB: componer el documento en vez de usar su miniatura
+        self.cancelled = False  # Se activa si la carpeta cambia o el label sale de la zona visible
+        self.priority = 0
+        # El visor guarda la referencia hasta que termina: así tryTake/start
+        # siempre reciben un objeto vivo (con autoDelete lo libera el pool)
+        self.setAutoDelete(False)
+
+    @property
+    def smooth(self) -> bool:
+        """True si esta tarea es la segunda pasada (SmoothTransformation)"""
+        return self.source is not None
+
+    def run(self):
+        try:
+            self._run()
+        finally:
+            self.signals.released.emit(self)
+
+    def _run(self):
+        if self.cancelled:
+            return
+
+        final = True
+        try:
+            if self.smooth:
+                image = self._scale(self.source, Qt.TransformationMode.SmoothTransformation)
+                self._save_cached(image)
+            else:
+                image = self._load_cached()
+                if image.isNull():
+                    self.source = self._decode_source()
+                    if self.source.isNull():
+                        image = self.source
+                    else:
+                        image = self._scale(self.source, Qt.TransformationMode.FastTransformation)
+                        final = False
+        except Exception:
+            image = QImage()
+
+        if not self.cancelled:
+            self.signals.finished.emit(self.thumb_id, image, final)
+
+    def _scale(self, image: QImage, mode: Qt.TransformationMode) -> QImage:
+        """Escala la imagen al tamaño de la miniatura manteniendo el aspecto"""
+        return image.scaled(self.size, self.size, Qt.AspectRatioMode.KeepAspectRatio, mode)
+
+    def _decode_source(self) -> QImage:
+        """
+        Decodifica el original a un tamaño intermedio (el doble de la miniatura)
+
+        QImageReader.setScaledSize permite que el decodificador (p. ej. JPEG)
+        reduzca durante la lectura en lugar de decodificar a resolución completa.
+        El margen x2 deja detalle suficiente para la pasada suave.
+
+        Para PSD/PSB se usa la miniatura incrustada en el archivo; el documento
+        completo solo se compone si se pidió explícitamente (``full_decode``).
+        """
+        if self.image_path.suffix.lower() in PHOTOSHOP_SUFFIXES:
+            if self.full_decode:
+                return _load_psd_full(self.image_path)
+            return _load_psd_preview(self.image_path)
+
+        reader = QImageReader(str(self.image_path))
+        reader.setAutoTransform(True)
+        size = reader.size()
+        limit = self.size * 2
+        if size.isValid() and (size.width() > limit or size.height() > limit):
+            size.scale(limit, limit, Qt.AspectRatioMode.KeepAspectRatio)
+            reader.setScaledSize(size)
+        return reader.read()
+
+    def _load_cached(self) -> QImage:
+        """Lee la miniatura de la caché de disco (QImage nula si no existe)"""
+        if self.cache_file is None or not self.cache_file.exists():
+            return QImage()
+        # Se convierte aquí (hilo del pool) al formato nativo de QPixmap, así
+        # QPixmap.fromImage no tiene que convertir en el hilo de la GUI
+        return QImage(str(self.cache_file)).convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+    def _save_cached(self, image: QImage):
+        """Guarda la miniatura en la caché de disco; los errores de escritura se ignoran"""
+        if self.cache_file is None:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            image.save(str(self.cache_file), THUMB_CACHE_FORMAT, THUMB_CACHE_QUALITY)
+        except OSError:
+            pass
+
+
 class ImageViewer(QDialog):
     """
     Ventana para visualizar todas las imágenes de una carpeta en una cuadrícula
+
+    Usa un QListView en modo iconos: el view solo pinta (y solo pide al modelo)
+    las miniaturas visibles, así que la memoria y el layout no crecen con la
+    cantidad de archivos. Las miniaturas se decodifican en un QThreadPool.
     """
 
     SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tiff', '.tga', '.psd', '.psb', '.jfif')
+    _SUPPORTED_EXT = frozenset(ext[1:] for ext in SUPPORTED_FORMATS)  # Extensiones sin punto
     THUMBNAIL_SIZE = 200  # Tamaño de las miniaturas
+    THUMBNAIL_QSIZE = QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+    GRID_SIZE = QSize(220, 240)  # Celda de cada miniatura (imagen + nombre + márgenes)
+    SCROLL_THROTTLE_MS = 80  # Intervalo mínimo entre revisiones de visibilidad
+    BUFFER_ROWS = 2  # Filas extra (arriba y abajo) que se cargan fuera del viewport
+    CHUNK_SIZE = 30  # Miniaturas por lote de layout del QListView
+    PIXMAP_CACHE_KB = 128 * 1024  # Límite de la caché de miniaturas en memoria (QPixmapCache, LRU)
+    MAX_QUEUED_TASKS = 200  # Máximo de miniaturas en cola; las de menor prioridad se cancelan
+
+    # Estilos de la ventana: se aplican una sola vez y se asignan por objectName
+    STYLE_SHEET = """
+        QLabel#pathLabel { font-weight: bold; padding: 5px; }
+        QLabel#imageCountLabel { padding: 5px; }
+        QLabel#noImagesLabel { color: gray; font-size: 14px; padding: 20px; }
+        QListView#thumbView { font-size: 10px; color: #666; }
+    """
+
+    # Prioridades del QThreadPool (mayor valor = se ejecuta antes)
+    PRIORITY_VISIBLE = 2  # Dentro del viewport
+    PRIORITY_BUFFER = 1  # En las filas de margen alrededor del viewport
+    PRIORITY_SMOOTH = 0  # Segunda pasada (suavizado) de miniaturas ya mostradas
+
+    scanRequested = Signal(int, str)  # token, carpeta
 
     def __init__(self, folder_path: str, parent=None):
         super().__init__(parent)
         self.folder_path = Path(folder_path) if folder_path else None
-        self.image_labels = []
+        # El límite es global: solo se sube, para no achicar el de otros visores
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), self.PIXMAP_CACHE_KB))
+
+        # Decodificación de miniaturas en segundo plano, en un pool propio: el
+        # global lo comparten el editor y el slideshow y no se le cambia la concurrencia
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(os.cpu_count() or 1)
+        self._thumb_signals = ThumbSignals()
+        self._thumb_signals.finished.connect(self._on_thumbnail_ready)
+        self._rows_by_id = {}  # thumb_id -> fila del modelo
+        self._pending_tasks = {}  # thumb_id -> ThumbTask
+        self._live_tasks = set()  # Tareas entregadas al pool que aún no terminaron
+        self._thumb_signals.released.connect(self._live_tasks.discard)
+        self._next_thumb_id = 0
+        self._cache_dir = Path(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+        ) / 'thumbnails'
+
+        # Listado de carpetas en segundo plano
+        self._scan_token = 0  # Se incrementa en cada escaneo para descartar resultados viejos
+        self._last_folder_mtime = None  # mtime de la carpeta cargada (detecta archivos nuevos/borrados)
+        self._scan_thread = QThread(self)
+        self._scan_worker = DirScanWorker(self._SUPPORTED_EXT)
+        self._scan_worker.moveToThread(self._scan_thread)
+        self._scan_thread.finished.connect(self._scan_worker.deleteLater)
+        self.scanRequested.connect(self._scan_worker.scan)
+        self._scan_worker.found.connect(self._on_scan_finished)
+        self._scan_thread.start()
+
+        # Timer para limitar la frecuencia de revisión durante el scroll
+        self._visibility_timer = QTimer(self)
+        self._visibility_timer.setSingleShot(True)
+        self._visibility_timer.setInterval(self.SCROLL_THROTTLE_MS)
+        self._visibility_timer.timeout.connect(self._load_visible_thumbnails)
 
         self._setup_ui()
         if self.folder_path and self.folder_path.exists():
@@ -40,6 +481,7 @@ class ImageViewer(QDialog):
         self.setWindowTitle("Visor de Imágenes")
         self.setMinimumSize(800, 600)
         self.resize(1000, 700)
+        self.setStyleSheet(self.STYLE_SHEET)
 
         # Layout principal
         main_layout = QVBoxLayout(self)
@@ -47,9 +489,9 @@ class ImageViewer(QDialog):
         # Header con información
         header_layout = QHBoxLayout()
         self.path_label = QLabel()
-        self.path_label.setStyleSheet("font-weight: bold; padding: 5px;")
+        self.path_label.setObjectName("pathLabel")
         self.image_count_label = QLabel("0 imágenes")
-        self.image_count_label.setStyleSheet("padding: 5px;")
+        self.image_count_label.setObjectName("imageCountLabel")
 
         header_layout.addWidget(QLabel("Carpeta:"))
         header_layout.addWidget(self.path_label, 1)
@@ -57,20 +499,35 @@ class ImageViewer(QDialog):
 
         main_layout.addLayout(header_layout)
 
-        # Área de scroll para las imágenes
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-
-        # Widget contenedor para la cuadrícula
-        self.grid_widget = QWidget()
-        self.grid_layout = QGridLayout(self.grid_widget)
-        self.grid_layout.setSpacing(10)
-        self.grid_layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
-
-        scroll_area.setWidget(self.grid_widget)
-        main_layout.addWidget(scroll_area)
+        # Mensaje para carpetas sin imágenes
+        self.no_images_label = QLabel("No se encontraron imágenes en esta carpeta")
+        self.no_images_label.setObjectName("noImagesLabel")
+        self.no_images_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.no_images_label.hide()
+        main_layout.addWidget(self.no_images_label)
+
+        # Cuadrícula de miniaturas
+        self.thumb_model = ThumbModel(self.THUMBNAIL_SIZE, self)
+        self.thumb_model.thumbnailRequested.connect(self._load_thumbnail)
+
+        self.thumb_view = QListView()
+        self.thumb_view.setObjectName("thumbView")
+        self.thumb_view.setViewMode(QListView.ViewMode.IconMode)
+        self.thumb_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.thumb_view.setMovement(QListView.Movement.Static)
+        self.thumb_view.setWrapping(True)
+        self.thumb_view.setWordWrap(True)
+        self.thumb_view.setUniformItemSizes(True)  # Qt no calcula el tamaño de cada item
+        self.thumb_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.thumb_view.setBatchSize(self.CHUNK_SIZE)
+        self.thumb_view.setIconSize(self.THUMBNAIL_QSIZE)
+        self.thumb_view.setGridSize(self.GRID_SIZE)
+        self.thumb_view.setSpacing(10)
+        self.thumb_view.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        self.thumb_view.setModel(self.thumb_model)
+        self.thumb_view.clicked.connect(self._on_thumbnail_clicked)
+        self.thumb_view.verticalScrollBar().valueChanged.connect(self._schedule_visibility_check)
+        main_layout.addWidget(self.thumb_view, 1)
 
         # Botón de cerrar
         close_button = QPushButton("Cerrar")
@@ -81,98 +538,250 @@ class ImageViewer(QDialog):
             self.path_label.setText(str(self.folder_path))
 
     def _load_images(self):
-        """Carga y muestra todas las imágenes de la carpeta"""
+        """Carga la lista de imágenes de la carpeta en el modelo"""
         if not self.folder_path or not self.folder_path.exists():
             self.path_label.setText("Carpeta no válida")
             return
 
-        # Limpiar grid anterior
-        self._clear_grid()
+        # Cancelar las miniaturas pendientes de la carpeta anterior
+        self._cancel_all_thumbnails()
 
         # Buscar todas las imágenes
-        image_files = []
         if self.folder_path.is_file():
             # Si es un archivo, usar su directorio padre
             self.folder_path = self.folder_path.parent
 
-        for file in natsorted(self.folder_path.iterdir()):
-            if file.is_file() and file.suffix.lower() in self.SUPPORTED_FORMATS:
-                image_files.append(file)
+        self._last_folder_mtime = self._folder_mtime(self.folder_path)
 
-        # Actualizar contador
-        self.image_count_label.setText(f"{len(image_files)} imagen{'es' if len(image_files) != 1 else ''}")
+        # El listado se hace en el hilo de DirScanWorker; el resultado llega a _on_scan_finished
+        self._scan_token += 1
+        self.thumb_model.set_files([])
+        self.no_images_label.hide()
+        self.image_count_label.setText("Escaneando...")
+        self.scanRequested.emit(self._scan_token, str(self.folder_path))
+
+    def _on_scan_finished(self, token: int, image_files: list):
+        """
+        Recibe el listado de la carpeta (hilo de la GUI) y lo carga en el modelo
 
-        if not image_files:
-            no_images_label = QLabel("No se encontraron imágenes en esta carpeta")
-            no_images_label.setStyleSheet("color: gray; font-size: 14px; padding: 20px;")
-            no_images_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.grid_layout.addWidget(no_images_label, 0, 0)
+        Args:
+            token: Token del escaneo; si la carpeta cambió desde entonces se descarta
+            image_files: [(ruta, mtime_ns)] en orden natural
+        """
+        if token != self._scan_token:
             return
 
-        # Mostrar imágenes en cuadrícula (3 columnas)
-        columns = 3
-        for index, image_file in enumerate(image_files):
-            row = index // columns
-            col = index % columns
-            image_widget = self._create_image_widget(image_file)
-            self.grid_layout.addWidget(image_widget, row, col)
+        # Actualizar contador
+        self.image_count_label.setText(f"{len(image_files)} imagen{'es' if len(image_files) != 1 else ''}")
+        self.no_images_label.setVisible(not image_files)
 
-    def _create_image_widget(self, image_path: Path) -> QWidget:
+        self.thumb_model.set_files(image_files)
+        self._schedule_visibility_check()
+
+    def _load_thumbnail(self, row: int, priority: int = PRIORITY_VISIBLE, full_decode: bool = False):
         """
-        Crea un widget que contiene una imagen miniatura y su nombre
+        Encola la decodificación de la miniatura de una fila en el QThreadPool
 
         Args:
-            image_path: Ruta al archivo de imagen
+            row: Fila del modelo
+            priority: Prioridad en la cola del QThreadPool
+            full_decode: Para PSD/PSB, componer el documento completo con psd_tools
+        """
+        self.thumb_model.mark_requested(row)
+        image_path, mtime_ns = self.thumb_model.file_at(row)
+
+        thumb_id = self._next_thumb_id
+        self._next_thumb_id += 1
+        self._rows_by_id[thumb_id] = row
+
+        cache_file = _thumb_cache_path(self._cache_dir, image_path, mtime_ns, self.THUMBNAIL_SIZE)
+        task = ThumbTask(
+            thumb_id, image_path, self.THUMBNAIL_SIZE, self._thumb_signals, cache_file,
+            full_decode=full_decode
+        )
+        task.priority = priority
+        self._pending_tasks[thumb_id] = task
+        self._start_task(task, priority)
+
+    def _start_task(self, task: ThumbTask, priority: int):
+        """Encola una tarea en el pool guardando su referencia hasta que termine"""
+        self._live_tasks.add(task)
+        self._thread_pool.start(task, priority)
+
+    def _cancel_thumbnail(self, thumb_id: int):
+        """Cancela una tarea pendiente; la fila se volverá a pedir cuando se pinte de nuevo"""
+        task = self._pending_tasks.pop(thumb_id, None)
+        if task is not None:
+            task.cancelled = True
+            # Si aún no empezó se saca de la cola; si está corriendo termina sola
+            if self._thread_pool.tryTake(task):
+                self._live_tasks.discard(task)
+        row = self._rows_by_id.pop(thumb_id, None)
+        if row is not None:
+            self.thumb_model.unmark_requested(row)
+
+    def _cancel_all_thumbnails(self):
+        """Cancela todas las tareas pendientes (cambio de carpeta)"""
+        for task in self._pending_tasks.values():
+            task.cancelled = True
+        self._pending_tasks.clear()
+        self._rows_by_id.clear()
+
+    def _reprioritize_thumbnail(self, task: ThumbTask, priority: int):
+        """Mueve una tarea que aún no empezó a otra posición de la cola"""
+        if task.priority == priority:
+            return
+        # tryTake solo tiene éxito si la tarea no empezó (la tarea sigue viva:
+        # el visor guarda su referencia)
+        if self._thread_pool.tryTake(task):
+            task.priority = priority
+            self._thread_pool.start(task, priority)
 
-        Returns:
-            QWidget con la imagen y su información
+    def _on_thumbnail_ready(self, thumb_id: int, image: QImage, final: bool):
         """
-        container = QWidget()
-        container.setMaximumWidth(self.THUMBNAIL_SIZE + 20)
-        layout = QVBoxLayout(container)
-        layout.setSpacing(5)
-        layout.setContentsMargins(5, 5, 5, 5)
+        Recibe la miniatura decodificada y la instala en el modelo (hilo de la GUI)
 
-        # Label para la imagen
-        image_label = QLabel()
-        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        image_label.setFixedSize(self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE)
-        image_label.setStyleSheet("border: 1px solid #ccc; background-color: #f0f0f0;")
+        Si es la versión rápida, encola con baja prioridad la pasada suave que la reemplaza.
+        """
+        task = self._pending_tasks.pop(thumb_id, None)
+        if final:
+            row = self._rows_by_id.pop(thumb_id, None)
+        else:
+            row = self._rows_by_id.get(thumb_id)
+        if row is None:
+            # La tarea pertenece a una carpeta anterior o fue cancelada
+            return
 
-        # Cargar y escalar imagen
-        try:
-            pixmap = QPixmap(str(image_path))
-            if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    self.THUMBNAIL_SIZE,
-                    self.THUMBNAIL_SIZE,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
+        if not image.isNull():
+            self.thumb_model.set_thumbnail(row, QPixmap.fromImage(image), final)
+
+            if not final and task is not None:
+                smooth_task = ThumbTask(
+                    thumb_id, task.image_path, self.THUMBNAIL_SIZE, self._thumb_signals,
+                    task.cache_file, task.source
                 )
-                image_label.setPixmap(scaled_pixmap)
-            else:
-                image_label.setText("Error\ncargando\nimagen")
-                image_label.setStyleSheet("border: 1px solid #f00; background-color: #fee;")
-        except Exception as e:
-            image_label.setText(f"Error:\n{str(e)[:20]}")
-            image_label.setStyleSheet("border: 1px solid #f00; background-color: #fee;")
+                smooth_task.priority = self.PRIORITY_SMOOTH
+                self._pending_tasks[thumb_id] = smooth_task
+                self._start_task(smooth_task, self.PRIORITY_SMOOTH)
+        elif (task is not None and not task.full_decode
+              and task.image_path.suffix.lower() in PHOTOSHOP_SUFFIXES):
+            # PSD sin miniatura incrustada: no se compone hasta que el usuario lo pida
+            self.thumb_model.set_stub(row)
+        else:
+            self.thumb_model.set_error(row)
+
+    def _on_thumbnail_clicked(self, index: QModelIndex):
+        """Abre la imagen completa o, si es un PSD sin miniatura, lo decodifica bajo demanda"""
+        row = index.row()
+        if self.thumb_model.is_stub(row):
+            self.thumb_model.clear_stub(row)
+            self._load_thumbnail(row, self.PRIORITY_VISIBLE, full_decode=True)
+            return
+        image_path, _ = self.thumb_model.file_at(row)
+        self._show_full_image(image_path)
 
-        layout.addWidget(image_label)
+    def _schedule_visibility_check(self, *_):
+        """Programa una revisión de miniaturas visibles (como máximo una cada SCROLL_THROTTLE_MS)"""
+        if not self._visibility_timer.isActive():
+            self._visibility_timer.start()
 
-        # Label para el nombre del archivo
-        name_label = QLabel(image_path.name)
-        name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        name_label.setWordWrap(True)
-        name_label.setStyleSheet("font-size: 10px; color: #666;")
-        name_label.setMaximumWidth(self.THUMBNAIL_SIZE)
-        layout.addWidget(name_label)
+    def _visible_row_range(self) -> tuple:
+        """
+        Retorna (primera, última) fila visible del QListView, o None si no hay filas
 
-        # Hacer clickeable para ver en tamaño completo
-        image_label.mousePressEvent = lambda event: self._show_full_image(image_path)
-        image_label.setCursor(Qt.CursorShape.PointingHandCursor)
+        Todas las celdas miden lo mismo, así que basta con indexAt sobre la primera
+        columna arriba y abajo del viewport. Con el layout por lotes las filas que
+        aún no se ubicaron no tienen rectángulo: mientras el layout no cubra el
+        viewport retorna None (las visibles las sigue pidiendo el view al pintar).
+        """
+        row_count = self.thumb_model.rowCount()
+        if row_count == 0:
+            return None
+        view = self.thumb_view
+        viewport_height = view.viewport().height()
+        cell_width = self.GRID_SIZE.width() + view.spacing()
+        cell_height = self.GRID_SIZE.height() + view.spacing()
+        x = view.spacing() + self.GRID_SIZE.width() // 2
+        step = max(1, cell_height // 8)
+
+        def row_at(heights):
+            for y in heights:
+                index = view.indexAt(QPoint(x, y))
+                if index.isValid():
+                    return index.row()
+            return None
+
+        first = row_at(range(0, cell_height, step))
+        if first is None:
+            return None
+
+        last_row_start = row_at(range(viewport_height - 1, viewport_height - 1 - cell_height, -step))
+        if last_row_start is not None:
+            columns = max(1, (view.viewport().width() - view.spacing()) // cell_width)
+            last = min(row_count - 1, last_row_start + columns - 1)
+        else:
+            # El contenido termina antes del borde inferior: solo vale si la última
+            # fila ya fue ubicada por el layout
+            rect = view.visualRect(self.thumb_model.index(row_count - 1))
+            if not rect.isValid() or rect.top() > viewport_height:
+                return None
+            last = row_count - 1
+
+        if first > last:
+            return None
+        return first, last
+
+    def _load_visible_thumbnails(self):
+        """
+        Encola las miniaturas de BUFFER_ROWS filas alrededor del viewport y reordena la cola
 
-        self.image_labels.append(image_label)
-        return container
+        El view ya pide las visibles al pintarlas; aquí se adelantan las del margen
+        con menor prioridad, y las tareas pendientes de filas que quedaron fuera de
+        ambas zonas (scroll rápido) se cancelan.
+        """
+        visible = self._visible_row_range()
+        if visible is None:
+            return
+        first, last = visible
+
+        columns = max(1, self.thumb_view.viewport().width() // self.GRID_SIZE.width())
+        buffer_first = max(0, first - self.BUFFER_ROWS * columns)
+        buffer_last = min(self.thumb_model.rowCount() - 1, last + self.BUFFER_ROWS * columns)
+
+        for row in range(buffer_first, buffer_last + 1):
+            if self.thumb_model.is_requested(row) or self.thumb_model.is_stub(row):
+                continue
+            if QPixmapCache.find(self.thumb_model.cache_key(row)) is not None:
+                continue
+            priority = self.PRIORITY_VISIBLE if first <= row <= last else self.PRIORITY_BUFFER
+            self._load_thumbnail(row, priority)
+
+        queued = []  # (prioridad, thumb_id) de las tareas que siguen en cola
+        for thumb_id, task in list(self._pending_tasks.items()):
+            row = self._rows_by_id.get(thumb_id)
+            if row is None or not buffer_first <= row <= buffer_last:
+                self._cancel_thumbnail(thumb_id)
+                continue
+            if not task.smooth:
+                priority = self.PRIORITY_VISIBLE if first <= row <= last else self.PRIORITY_BUFFER
+                self._reprioritize_thumbnail(task, priority)
+            queued.append((task.priority, thumb_id))
+
+        # Limitar el tamaño de la cola descartando primero las de menor prioridad
+        if len(queued) > self.MAX_QUEUED_TASKS:
+            queued.sort(key=lambda item: item[0], reverse=True)
+            for _, thumb_id in queued[self.MAX_QUEUED_TASKS:]:
+                self._cancel_thumbnail(thumb_id)
+
+    def showEvent(self, event):
+        """Revisa las miniaturas visibles al mostrar la ventana"""
+        super().showEvent(event)
+        self._schedule_visibility_check()
+
+    def resizeEvent(self, event):
+        """Al redimensionar pueden entrar nuevas miniaturas en el viewport"""
+        super().resizeEvent(event)
+        self._schedule_visibility_check()
 
     def _show_full_image(self, image_path: Path):
         """
@@ -194,15 +803,18 @@ class ImageViewer(QDialog):
         image_label = QLabel()
         image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        pixmap = QPixmap(str(image_path))
+        # Reducir al tamaño de la pantalla durante la decodificación: las imágenes
+        # muy grandes no llegan a ocupar memoria a resolución completa
+        screen = QApplication.primaryScreen().availableGeometry()
+        reader = QImageReader(str(image_path))
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > screen.width() or size.height() > screen.height()):
+            size.scale(screen.width(), screen.height(), Qt.AspectRatioMode.KeepAspectRatio)
+            reader.setScaledSize(size)
+
+        pixmap = QPixmap.fromImage(reader.read())
         if not pixmap.isNull():
-            # Escalar a un tamaño razonable si es muy grande
-            if pixmap.width() > 1600 or pixmap.height() > 1200:
-                pixmap = pixmap.scaled(
-                    1600, 1200,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
             image_label.setPixmap(pixmap)
         else:
             image_label.setText("Error cargando imagen")
@@ -217,13 +829,14 @@ class ImageViewer(QDialog):
 
         full_image_dialog.exec()
 
-    def _clear_grid(self):
-        """Limpia todos los widgets del grid"""
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        self.image_labels.clear()
+    def done(self, result: int):
+        """Detiene el hilo de escaneo y descarta las miniaturas en cola al cerrar el diálogo"""
+        self._scan_thread.quit()
+        self._scan_thread.wait()
+        # El pool es del diálogo y al destruirse espera su cola: vaciarla antes
+        self._cancel_all_thumbnails()
+        self._thread_pool.clear()
+        super().done(result)
 
     def set_folder(self, folder_path: str):
         """
@@ -232,10 +845,37 @@ class ImageViewer(QDialog):
         Args:
             folder_path: Nueva ruta de carpeta
         """
-        self.folder_path = Path(folder_path) if folder_path else None
+        new_path = Path(folder_path) if folder_path else None
+
+        # Misma carpeta sin cambios (el mtime del directorio cambia al agregar,
+        # borrar o renombrar archivos): no hay nada que recargar. Se compara
+        # igual que la normaliza _load_images (un archivo carga su carpeta)
+        if new_path and self.folder_path and self._last_folder_mtime is not None:
+            new_folder = self._normalized_folder(new_path)
+            if (new_folder == self._normalized_folder(self.folder_path)
+                    and self._folder_mtime(new_folder) == self._last_folder_mtime):
+                return
+
+        self.folder_path = new_path
         self.path_label.setText(str(self.folder_path) if self.folder_path else "")
         self._load_images()
 
+    @staticmethod
+    def _normalized_folder(folder_path: Path) -> Path:
+        """Ruta absoluta de la carpeta que se carga (la carpeta padre si es un archivo)"""
+        folder = os.path.abspath(folder_path)
+        if os.path.isfile(folder):
+            folder = os.path.dirname(folder)
+        return Path(folder)
+
+    @staticmethod
+    def _folder_mtime(folder_path: Path):
+        """Retorna el mtime (ns) de la carpeta, o None si no se puede leer"""
+        try:
+            return folder_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
 
 # Para pruebas independientes
 if __name__ == "__main__":
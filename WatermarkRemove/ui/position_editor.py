@@ -3,16 +3,16 @@ Editor interactivo de posiciones de marcas de agua - Version reorganizada
 """
 import os
 import sys
+from collections import OrderedDict
 from pathlib import Path
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QComboBox, QGroupBox, QFileDialog, QWidget, QMessageBox,
-    QScrollArea, QSlider, QSpinBox
+    QScrollArea, QSlider, QSpinBox, QSizePolicy
 )
-from PySide6.QtCore import Qt, Signal, QEvent
-from PySide6.QtGui import QPixmap, QKeyEvent, QImage, QWheelEvent
+from PySide6.QtCore import Qt, Signal, QEvent, QTimer, QObject, QRunnable, QThreadPool
+from PySide6.QtGui import QPixmap, QKeyEvent, QImage, QWheelEvent, QPainter
 import numpy as np
-import cv2
 
 # Agregar el directorio raíz al path
 current_dir = os.path.abspath(os.path.dirname(__file__))
@@ -23,50 +23,179 @@ if parent_dir not in sys.path:
 from utils import UtilJson
 from WatermarkRemove import load_images_cv2, align_watermark, remove_watermark
 from natsort import natsorted
+from .decode_tasks import DecodeSignals, DecodeTask, load_watermark_cached
+
+
+def _render_patch(image: np.ndarray, watermark: np.ndarray, offset_x: int, offset_y: int,
+                  side_x: str, side_y: str) -> tuple:
+    """
+    Remueve la marca de agua solo en la región de la imagen que cubre
+
+    remove_watermark no modifica nada fuera de esa región, así que el preview
+    completo es la imagen original con este parche pegado encima. No modifica
+    sus argumentos, así que se puede llamar desde un hilo del QThreadPool.
+
+    Returns:
+        tuple: (x0, y0, parche BGR); el parche es None si la marca queda fuera de la imagen
+    """
+    # Calcular coordenadas
+    x, y = align_watermark(
+        image, watermark,
+        offset_x=offset_x, offset_y=offset_y,
+        side_x=side_x, side_y=side_y
+    )
+
+    # Región de la imagen cubierta por la marca (recortada a los bordes)
+    h_img, w_img = image.shape[:2]
+    h_wm, w_wm = watermark.shape[:2]
+    x_int, y_int = int(np.floor(x)), int(np.floor(y))
+    x0, y0 = min(max(0, x_int), w_img), min(max(0, y_int), h_img)
+    x1, y1 = min(w_img, max(0, x_int + w_wm)), min(h_img, max(0, y_int + h_wm))
+    if x0 >= x1 or y0 >= y1:
+        return x0, y0, None
+
+    # Aplicar remove_watermark solo al recorte; las coordenadas se desplazan
+    # en enteros, así que la parte subpíxel se conserva
+    patch = remove_watermark(image[y0:y1, x0:x1], watermark, x - x0, y - y0)
+    return x0, y0, patch
+
+
+class PreviewSignals(QObject):
+    """Señales de PreviewTask"""
+
+    finished = Signal(object, object)  # clave del preview, (x0, y0, parche) o None si falló
+
+
+class PreviewTask(QRunnable):
+    """Calcula en un hilo del QThreadPool el preview de una imagen ya decodificada"""
+
+    def __init__(self, key: tuple, image: np.ndarray, watermark: np.ndarray, signals: PreviewSignals):
+        super().__init__()
+        self.key = key  # (índice de imagen, índice de marca, side_x, side_y, offset_x, offset_y)
+        self.image = image
+        self.watermark = watermark
+        self.signals = signals
+
+    def run(self):
+        _, _, side_x, side_y, offset_x, offset_y = self.key
+        try:
+            preview = _render_patch(self.image, self.watermark, offset_x, offset_y, side_x, side_y)
+        except Exception:
+            preview = None
+        self.signals.finished.emit(self.key, preview)
+
+
+class WatermarkPreloadTask(QRunnable):
+    """Decodifica una marca de agua en la caché de load_watermark_cached"""
+
+    def __init__(self, watermark_path: str):
+        super().__init__()
+        self.watermark_path = watermark_path
+
+    def run(self):
+        try:
+            load_watermark_cached(self.watermark_path)
+        except Exception:
+            # Si falla, _load_current_watermark lo reintenta y muestra el error
+            pass
+
+
+class SavePositionsTask(QRunnable):
+    """Escribe el progreso de una carpeta de marcas en un JSON en segundo plano"""
+
+    def __init__(self, json_path: Path, folder_name: str, progress: dict):
+        super().__init__()
+        self.json_path = json_path
+        self.folder_name = folder_name
+        self.progress = progress  # Copia: la lista del editor sigue creciendo
+
+    def run(self):
+        try:
+            UtilJson(self.json_path).set(self.folder_name, self.progress)
+        except Exception as e:
+            print(f"✗ No se pudo guardar el progreso en '{self.json_path.name}': {e}")
+
 
 class ZoomableImageLabel(QLabel):
     """Label que soporta zoom con scroll del mouse"""
 
+    SMOOTH_DELAY_MS = 150  # Inactividad tras el último cambio antes del escalado suave
+    SMOOTH_MIN_ZOOM = 75  # Por debajo el escalado rápido se ve igual y cuesta mucho menos
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.zoom_level = 100
-        self.original_pixmap = None
+        self.original_pixmap = None  # Pixmap a resolución original; se escala al pintar
+        self._dragging = False  # El slider de zoom está presionado
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setStyleSheet("background-color: #2b2b2b;")
-        self.setSizePolicy(
-            QWidget().sizePolicy().Policy.Expanding,
-            QWidget().sizePolicy().Policy.Expanding
-        )
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+        # Mientras se arrastra el slider se pinta con escalado rápido; el suave
+        # se usa cuando el zoom deja de cambiar
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(self.SMOOTH_DELAY_MS)
+        self._smooth_timer.timeout.connect(self.update)
 
-    def set_image(self, pixmap: QPixmap):
-        """Establece la imagen original"""
-        self.original_pixmap = pixmap
+    def set_image(self, image: QImage):
+        """
+        Establece la imagen original (None la quita para poder mostrar texto)
+
+        Se sube al driver una sola vez; el zoom se aplica al pintar, así que
+        cambiar de zoom no crea pixmaps escalados.
+        """
+        self.original_pixmap = QPixmap.fromImage(image) if image is not None else None
         self.update_display()
 
     def update_display(self):
-        """Actualiza la visualización con el zoom actual"""
+        """Ajusta el tamaño del label al zoom actual y lo repinta"""
         if self.original_pixmap is None:
+            self.update()
             return
 
-        # Calcular nuevo tamaño basado en zoom
-        scale_factor = self.zoom_level / 100.0
-        new_size = self.original_pixmap.size() * scale_factor
+        # El label mide lo mismo que la imagen escalada para que funcione el scroll
+        new_size = self.sizeHint()
+        if new_size != self.size():
+            self.resize(new_size)
+        self.update()
 
-        # Escalar imagen
-        scaled_pixmap = self.original_pixmap.scaled(
-            new_size,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
+    def sizeHint(self):
+        """Tamaño de la imagen con el zoom actual"""
+        if self.original_pixmap is None:
+            return super().sizeHint()
+        return self.original_pixmap.size() * (self.zoom_level / 100.0)
 
-        self.setPixmap(scaled_pixmap)
+    def paintEvent(self, event):
+        """Pinta la imagen escalada al tamaño del label (solo la región expuesta)"""
+        super().paintEvent(event)
+        if self.original_pixmap is None:
+            return
 
-        # Ajustar el tamaño del label al pixmap para que funcione el scroll
-        self.resize(scaled_pixmap.size())
+        painter = QPainter(self)
+        if (self.zoom_level != 100 and self.zoom_level >= self.SMOOTH_MIN_ZOOM
+                and not self._dragging and not self._smooth_timer.isActive()):
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(self.rect(), self.original_pixmap, self.original_pixmap.rect())
+        painter.end()
+
+    def set_dragging(self, dragging: bool):
+        """Mientras se arrastra el slider se pinta siempre con escalado rápido"""
+        self._dragging = dragging
+        if not dragging:
+            # Al soltar, el escalado suave se aplica sin esperar al timer
+            self._smooth_timer.stop()
+            self.update()
 
     def set_zoom(self, zoom: int):
         """Establece el nivel de zoom (10-200%)"""
-        self.zoom_level = max(10, min(200, zoom))
+        zoom = max(10, min(200, zoom))
+        if zoom == self.zoom_level:
+            return
+        self.zoom_level = zoom
+        if self.original_pixmap is not None and zoom >= self.SMOOTH_MIN_ZOOM:
+            self._smooth_timer.start()
+        self.updateGeometry()
         self.update_display()
 
 
@@ -78,6 +207,13 @@ class PositionEditor(QDialog):
     """
 
     SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tiff', '.tga', '.jfif')
+    PREVIEW_DELAY_MS = 40  # Espera tras el último cambio antes de recalcular el preview
+    PREVIEW_CACHE_SIZE = 32  # Parches de preview recientes guardados (LRU)
+    PREFETCH_AHEAD = 3  # Imágenes siguientes que se decodifican por adelantado
+    PROGRESS_SAVE_MS = 3000  # Como mucho una escritura del progreso cada tantos ms
+    # En little-endian Format_RGB32 guarda cada píxel como B, G, R, X: el mismo
+    # orden que OpenCV, y el formato nativo de QPixmap (fromImage no convierte)
+    PREVIEW_BGRX = sys.byteorder == 'little'
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -90,6 +226,8 @@ class PositionEditor(QDialog):
         self.current_image_index = 0
         self.current_image = None
         self.current_watermark = None
+        self._preview_buffer = None
+        self._preview_rect = None
 
         # Ruta base de marcas
         self.marcas_base_path = Path(os.path.dirname(current_dir)) / 'marcas'
@@ -102,6 +240,50 @@ class PositionEditor(QDialog):
 
         # Posiciones guardadas
         self.saved_positions = []
+        self._resume_checked = None  # (imágenes, marcas) para las que ya se ofreció retomar
+
+        # El progreso se escribe tras cada imagen en un JSON aparte (un hilo, en
+        # orden); wm_positions.json solo se actualiza al completar la carpeta
+        self._save_pool = QThreadPool(self)
+        self._save_pool.setMaxThreadCount(1)
+
+        # Cada escritura vuelca todas las posiciones: las de imágenes seguidas se
+        # agrupan en una sola con el estado más reciente
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(self.PROGRESS_SAVE_MS)
+        self._progress_timer.timeout.connect(self._flush_progress)
+
+        # Precarga de la siguiente imagen en segundo plano
+        self._prefetched = {}  # ruta -> ndarray ya decodificado
+        self._prefetching = set()  # Rutas con decodificación en curso
+        self._decode_signals = DecodeSignals()
+        self._decode_signals.finished.connect(self._on_image_decoded)
+
+        # Preview de la siguiente imagen calculado en segundo plano con la posición
+        # actual (al pasar de imagen la posición se mantiene)
+        self._next_preview = None  # (clave, (x0, y0, parche))
+        self._next_preview_busy = False  # Hay un PreviewTask en curso
+        self._next_preview_inputs = None  # (imagen, marca) del PreviewTask en curso
+        self._preview_signals = PreviewSignals()
+        self._preview_signals.finished.connect(self._on_next_preview_ready)
+
+        # Preview de la imagen actual: si no está en caché se calcula en el
+        # QThreadPool y la GUI solo pega el parche (una tarea a la vez)
+        self._preview_busy = False
+        self._preview_pending = False  # Se pidió otro preview mientras había uno en curso
+        self._preview_inputs = None  # (imagen, marca) del PreviewTask en curso
+        self._current_preview_signals = PreviewSignals()
+        self._current_preview_signals.finished.connect(self._on_preview_ready)
+
+        # Resultados recientes del preview: (imagen, marca, lados, offsets) -> BGR
+        self._preview_cache = OrderedDict()
+
+        # Timer que agrupa cambios seguidos (auto-repeat del SpinBox, etc.) en un solo preview
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._update_preview)
 
         self._setup_ui()
 
@@ -234,7 +416,9 @@ class PositionEditor(QDialog):
         self.offset_x_spin.setRange(-9999, 9999)
         self.offset_x_spin.setValue(0)
         self.offset_x_spin.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.offset_x_spin.valueChanged.connect(lambda v: self._on_offset_spin_changed('x', v))
+        # Al escribir, valueChanged solo se emite con Enter o al perder el foco
+        self.offset_x_spin.setKeyboardTracking(False)
+        self.offset_x_spin.valueChanged.connect(self._on_offset_x_changed)
         offset_x_layout.addWidget(self.offset_x_spin)
         
         offset_layout.addWidget(offset_x_container, 1)
@@ -250,7 +434,8 @@ class PositionEditor(QDialog):
         self.offset_y_spin.setRange(-9999, 9999)
         self.offset_y_spin.setValue(0)
         self.offset_y_spin.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.offset_y_spin.valueChanged.connect(lambda v: self._on_offset_spin_changed('y', v))
+        self.offset_y_spin.setKeyboardTracking(False)
+        self.offset_y_spin.valueChanged.connect(self._on_offset_y_changed)
         offset_y_layout.addWidget(self.offset_y_spin)
         
         offset_layout.addWidget(offset_y_container, 1)
@@ -300,6 +485,8 @@ class PositionEditor(QDialog):
         self.zoom_slider.setMaximum(200)
         self.zoom_slider.setValue(100)
         self.zoom_slider.valueChanged.connect(self._on_zoom_changed)
+        self.zoom_slider.sliderPressed.connect(lambda: self.image_label.set_dragging(True))
+        self.zoom_slider.sliderReleased.connect(lambda: self.image_label.set_dragging(False))
         zoom_layout.addWidget(self.zoom_slider, 1)
 
         self.zoom_label = QLabel("100%")
@@ -347,14 +534,15 @@ class PositionEditor(QDialog):
         elif axis == 'y':
             self.offset_y_spin.setValue(self.offset_y_spin.value() + delta)
 
-    def _on_offset_spin_changed(self, axis: str, value: int):
-        """Callback cuando cambia el valor del SpinBox"""
-        if axis == 'x':
-            self.offset_x = value
-        elif axis == 'y':
-            self.offset_y = value
+    def _on_offset_x_changed(self, value: int):
+        """Callback cuando cambia el valor del SpinBox horizontal"""
+        self.offset_x = value
+        self._preview_timer.start()
 
-        self._update_preview()
+    def _on_offset_y_changed(self, value: int):
+        """Callback cuando cambia el valor del SpinBox vertical"""
+        self.offset_y = value
+        self._preview_timer.start()
 
     def _select_images_folder(self):
         """Abre diálogo para seleccionar carpeta de imágenes"""
@@ -367,18 +555,26 @@ class PositionEditor(QDialog):
 
     def _load_watermark_folders(self):
         """Carga las carpetas disponibles en WatermarkRemove/marcas"""
-        self.watermark_folder_combo.clear()
+        # Igual que con las marcas: sin señales mientras se llena el combo
+        self.watermark_folder_combo.blockSignals(True)
+        try:
+            self.watermark_folder_combo.clear()
 
-        if not self.marcas_base_path.exists():
-            return
+            if not self.marcas_base_path.exists():
+                return
 
-        # Obtener subcarpetas ordenadas (más recientes primero)
-        folders = [f for f in self.marcas_base_path.iterdir() if f.is_dir()]
-        folders.sort(reverse=True)
+            # Obtener subcarpetas ordenadas (más recientes primero); is_dir usa el
+            # tipo que entrega scandir sin un stat por entrada
+            with os.scandir(self.marcas_base_path) as it:
+                folders = [entry for entry in it if entry.is_dir()]
+            folders.sort(key=lambda entry: entry.name, reverse=True)
 
-        # Agregar al combo: label = nombre, data = ruta completa
-        for folder in folders:
-            self.watermark_folder_combo.addItem(folder.name, str(folder))
+            # Agregar al combo: label = nombre, data = ruta completa
+            for folder in folders:
+                self.watermark_folder_combo.addItem(folder.name, folder.path)
+        finally:
+            self.watermark_folder_combo.blockSignals(False)
+        self._on_watermark_folder_changed(self.watermark_folder_combo.currentIndex())
 
     def _on_watermark_folder_changed(self, index):
         """Callback cuando cambia la carpeta de marcas seleccionada"""
@@ -389,6 +585,7 @@ class PositionEditor(QDialog):
         folder_path = self.watermark_folder_combo.currentData()
         if folder_path:
             self.watermarks_folder = Path(folder_path)
+            load_watermark_cached.cache_clear()
             self._load_watermarks_into_combo()
             self._check_ready()
 
@@ -397,28 +594,52 @@ class PositionEditor(QDialog):
         if not self.images_folder or not self.images_folder.exists():
             return
 
-        self.image_files = []
-        for file in natsorted(self.images_folder.iterdir()):
-            if file.is_file() and file.suffix.lower() in self.SUPPORTED_FORMATS:
-                self.image_files.append(file)
+        # os.scandir reutiliza el tipo de archivo que entrega el sistema al
+        # listar, sin un stat por archivo
+        with os.scandir(self.images_folder) as it:
+            entries = [
+                entry for entry in it
+                if entry.is_file(follow_symlinks=False)
+                and entry.name.lower().endswith(self.SUPPORTED_FORMATS)
+            ]
+        self.image_files = [Path(entry.path) for entry in natsorted(entries, key=lambda entry: entry.name)]
 
         self.current_image_index = 0
+        self._prefetched.clear()
+        self._next_preview = None
         self._update_counter()
 
     def _load_watermarks_into_combo(self):
         """Carga las marcas de agua PNG en el ComboBox desde la carpeta seleccionada"""
-        self.watermark_combo.clear()
-        self.watermark_files = []
-
-        if not self.watermarks_folder or not self.watermarks_folder.exists():
-            return
-
-        # Cargar todos los archivos PNG de la carpeta
-        for file in natsorted(self.watermarks_folder.iterdir()):
-            if file.is_file() and file.suffix.lower() == '.png':
-                self.watermark_files.append(file)
+        # El combo se llena sin señales y la marca se carga una sola vez al final,
+        # con la lista ya completa
+        self.watermark_combo.blockSignals(True)
+        try:
+            self.watermark_combo.clear()
+            self.watermark_files = []
+
+            if not self.watermarks_folder or not self.watermarks_folder.exists():
+                return
+
+            # Cargar todos los archivos PNG de la carpeta
+            with os.scandir(self.watermarks_folder) as it:
+                entries = [
+                    entry for entry in it
+                    if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith('.png')
+                ]
+            for entry in natsorted(entries, key=lambda entry: entry.name):
+                self.watermark_files.append(Path(entry.path))
                 # Agregar al ComboBox: nombre del archivo como label, ruta como data
-                self.watermark_combo.addItem(file.name, str(file))
+                self.watermark_combo.addItem(entry.name, entry.path)
+        finally:
+            self.watermark_combo.blockSignals(False)
+        self._on_watermark_changed(self.watermark_combo.currentIndex())
+
+        # Decodificar en segundo plano el resto de las marcas (hasta lo que cabe
+        # en la caché) para que cambiar de marca en el combo sea inmediato
+        preload_count = load_watermark_cached.cache_info().maxsize
+        for path in self.watermark_files[:preload_count]:
+            QThreadPool.globalInstance().start(WatermarkPreloadTask(str(path)))
 
     def _check_ready(self):
         """Verifica si está listo para editar"""
@@ -431,6 +652,7 @@ class PositionEditor(QDialog):
 
         if ready:
             self.btn_save.setEnabled(ready)
+            self._offer_resume()
             self._load_current_image()
             self._load_current_watermark()
             self._update_preview()
@@ -440,8 +662,110 @@ class PositionEditor(QDialog):
         if not self.image_files or self.current_image_index >= len(self.image_files):
             return
 
-        image_path = self.image_files[self.current_image_index]
-        self.current_image = load_images_cv2(str(image_path))
+        image_path = str(self.image_files[self.current_image_index])
+        image = self._prefetched.pop(image_path, None)
+        self.current_image = image if image is not None else load_images_cv2(image_path)
+        self._preview_cache.clear()
+
+        # Buffer del preview: copia de la imagen donde se pega el parche de la
+        # posición actual; al mover la marca solo se restaura el rectángulo anterior
+        if self.PREVIEW_BGRX:
+            height, width = self.current_image.shape[:2]
+            self._preview_buffer = np.empty((height, width, 4), dtype=np.uint8)
+            self._preview_buffer[:, :, :3] = self.current_image[:, :, :3]
+            self._preview_buffer[:, :, 3] = 255
+        else:
+            self._preview_buffer = self.current_image[:, :, :3].copy()
+        self._preview_rect = None  # (x0, y0, x1, y1) del parche pegado en el buffer
+
+        # Si el preview de esta imagen ya se calculó en segundo plano, aprovecharlo
+        if self._next_preview is not None:
+            key, preview = self._next_preview
+            self._next_preview = None
+            if key[0] == self.current_image_index:
+                self._preview_cache[key] = preview
+
+        # Mientras se edita esta imagen, decodificar las siguientes; las que
+        # quedaron atrás se descartan para acotar la memoria
+        window = self._prefetch_window()
+        for path in list(self._prefetched):
+            if path not in window:
+                del self._prefetched[path]
+        for index in range(self.current_image_index + 1, self.current_image_index + 1 + self.PREFETCH_AHEAD):
+            self._prefetch_image(index)
+
+    def _prefetch_window(self) -> set:
+        """Rutas de las PREFETCH_AHEAD imágenes siguientes a la actual"""
+        start = self.current_image_index + 1
+        return {str(path) for path in self.image_files[start:start + self.PREFETCH_AHEAD]}
+
+    def _prefetch_image(self, index: int):
+        """Encola la decodificación de la imagen ``index`` en el QThreadPool"""
+        if index >= len(self.image_files):
+            return
+        image_path = str(self.image_files[index])
+        if image_path in self._prefetched or image_path in self._prefetching:
+            return
+        self._prefetching.add(image_path)
+        QThreadPool.globalInstance().start(DecodeTask(image_path, self._decode_signals))
+
+    def _on_image_decoded(self, image_path: str, image):
+        """Guarda la imagen precargada si sigue dentro de las siguientes (hilo de la GUI)"""
+        self._prefetching.discard(image_path)
+        if image is not None and image_path in self._prefetch_window():
+            self._prefetched[image_path] = image
+            self._precompute_next_preview()
+
+    def _preview_key(self, image_index: int) -> tuple:
+        """Clave de la caché de previews para una imagen con la posición actual"""
+        return (
+            image_index, self.watermark_combo.currentIndex(),
+            self.side_x, self.side_y, self.offset_x, self.offset_y
+        )
+
+    def _precompute_next_preview(self):
+        """
+        Calcula en segundo plano el preview de la siguiente imagen con la posición actual
+
+        Solo hay una tarea a la vez; si la posición cambia mientras corre, al
+        terminar se lanza otra con la posición nueva.
+        """
+        if self._next_preview_busy or self.current_watermark is None:
+            return
+        next_index = self.current_image_index + 1
+        if next_index >= len(self.image_files):
+            return
+        image = self._prefetched.get(str(self.image_files[next_index]))
+        if image is None:
+            # Aún se está decodificando; _on_image_decoded vuelve a llamar
+            return
+        key = self._preview_key(next_index)
+        if self._next_preview is not None and self._next_preview[0] == key:
+            return
+
+        self._next_preview_busy = True
+        self._next_preview_inputs = (image, self.current_watermark)
+        QThreadPool.globalInstance().start(
+            PreviewTask(key, image, self.current_watermark, self._preview_signals)
+        )
+
+    def _on_next_preview_ready(self, key: tuple, preview):
+        """Guarda el preview de la siguiente imagen si nada cambió mientras se calculaba (hilo de la GUI)"""
+        self._next_preview_busy = False
+        image, watermark = self._next_preview_inputs
+        self._next_preview_inputs = None
+
+        next_index = self.current_image_index + 1
+        still_valid = (
+            next_index < len(self.image_files)
+            and key == self._preview_key(next_index)
+            and image is self._prefetched.get(str(self.image_files[next_index]))
+            and watermark is self.current_watermark
+        )
+        if preview is not None and still_valid:
+            self._next_preview = (key, preview)
+        elif preview is not None:
+            self._precompute_next_preview()
 
     def _load_current_watermark(self):
         """Carga la marca de agua seleccionada en el ComboBox"""
@@ -450,54 +774,132 @@ class PositionEditor(QDialog):
 
         watermark_index = self.watermark_combo.currentIndex()
         watermark_path = self.watermark_files[watermark_index]
-        self.current_watermark = load_images_cv2(str(watermark_path))
+        self.current_watermark = load_watermark_cached(str(watermark_path))
+        self._preview_cache.clear()
+        self._next_preview = None
 
     def _on_watermark_changed(self, index):
         """Callback cuando cambia la marca individual seleccionada"""
         if index >= 0:
             self._load_current_watermark()
-            self._update_preview()
+            self._preview_timer.start()
 
     def _on_position_changed(self):
         """Callback cuando cambian los controles de posición"""
         self.side_x = self.side_x_combo.currentData()
         self.side_y = self.side_y_combo.currentData()
-        self._update_preview()
+        self._preview_timer.start()
 
     def _update_preview(self):
         """Actualiza el preview con zoom y ajusta el tamaño de la ventana"""
+        # Un cambio pendiente queda cubierto por este recálculo
+        self._preview_timer.stop()
         if self.current_image is None or self.current_watermark is None:
             return
 
-        try:
-            # Hacer copia
-            img_copy = self.current_image.copy()
-
-            # Calcular coordenadas y aplicar remove_watermark
-            x, y = align_watermark(
-                img_copy, self.current_watermark,
-                offset_x=self.offset_x, offset_y=self.offset_y,
-                side_x=self.side_x, side_y=self.side_y
-            )
+        # Si el parche no está en caché, remove_watermark corre fuera de la GUI
+        key = self._preview_key(self.current_image_index)
+        if key not in self._preview_cache:
+            self._request_preview(key)
+            return
+        self._display_preview()
 
-            result_img = remove_watermark(img_copy, self.current_watermark, x, y)
+    def _request_preview(self, key: tuple):
+        """Encola el cálculo del parche de la imagen actual en el QThreadPool"""
+        if self._preview_busy:
+            # Al terminar la tarea en curso se vuelve a llamar a _update_preview
+            self._preview_pending = True
+            return
+        self._preview_busy = True
+        self._preview_pending = False
+        self._preview_inputs = (self.current_image, self.current_watermark)
+        QThreadPool.globalInstance().start(
+            PreviewTask(key, self.current_image, self.current_watermark, self._current_preview_signals)
+        )
 
-            # Convertir a RGB y QPixmap
-            result_rgb = cv2.cvtColor(result_img, cv2.COLOR_BGR2RGB)
-            height, width, channel = result_rgb.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(result_rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_image)
+    def _on_preview_ready(self, key: tuple, preview):
+        """Guarda el parche calculado y muestra el preview más reciente (hilo de la GUI)"""
+        self._preview_busy = False
+        image, watermark = self._preview_inputs
+        self._preview_inputs = None
+
+        # El parche sirve mientras no se haya cambiado de imagen ni de marca,
+        # aunque la posición ya sea otra (queda en la caché)
+        current = image is self.current_image and watermark is self.current_watermark
+        if current and preview is not None:
+            self._cache_preview(key, preview)
+
+        if current and preview is None and key == self._preview_key(self.current_image_index):
+            # Falló en el hilo: se repite aquí para mostrar el error
+            self._display_preview()
+        elif current or self._preview_pending:
+            self._update_preview()
+
+    def _cache_preview(self, key: tuple, preview: tuple):
+        """Guarda un parche en la caché LRU de previews"""
+        self._preview_cache[key] = preview
+        self._preview_cache.move_to_end(key)
+        if len(self._preview_cache) > self.PREVIEW_CACHE_SIZE:
+            self._preview_cache.popitem(last=False)
+
+    def _display_preview(self):
+        """Compone el preview de la posición actual y lo muestra"""
+        try:
+            result_bgr = self._compute_preview()
+
+            # Qt lee el buffer directamente (sin cvtColor); con BGRX además el
+            # QPixmap del label es una copia sin conversión de formato.
+            # QImage necesita filas contiguas: con otro layout leería basura
+            if not result_bgr.flags['C_CONTIGUOUS']:
+                result_bgr = np.ascontiguousarray(result_bgr)
+            height, width, channel = result_bgr.shape
+            q_format = QImage.Format.Format_RGB32 if channel == 4 else QImage.Format.Format_BGR888
+            q_image = QImage(result_bgr.data, width, height, result_bgr.strides[0], q_format)
 
             # Establecer imagen (el label maneja el zoom)
-            self.image_label.set_image(pixmap)
+            self.image_label.set_image(q_image)
 
             # Ajustar el tamaño de la ventana según la imagen
             self._adjust_window_size(width, height)
 
+            # Adelantar el preview de la siguiente imagen con esta misma posición
+            self._precompute_next_preview()
+
         except Exception as e:
+            self.image_label.set_image(None)
             self.image_label.setText(f"❌ Error: {str(e)}")
 
+    def _compute_preview(self) -> np.ndarray:
+        """
+        Retorna la imagen actual sin la marca de agua (BGRX, o BGR en big-endian) para la posición actual
+
+        Solo se procesa la región de la marca: el parche se pega en un buffer con
+        la imagen original, restaurando antes el rectángulo del parche anterior.
+        Los parches recientes se guardan en una caché LRU, así que volver a una
+        posición ya vista (p. ej. alternar entre dos offsets) no repite el proceso.
+        """
+        key = self._preview_key(self.current_image_index)
+        if key in self._preview_cache:
+            self._preview_cache.move_to_end(key)
+            x0, y0, patch = self._preview_cache[key]
+        else:
+            x0, y0, patch = _render_patch(
+                self.current_image, self.current_watermark,
+                self.offset_x, self.offset_y, self.side_x, self.side_y
+            )
+            self._cache_preview(key, (x0, y0, patch))
+
+        buffer = self._preview_buffer
+        if self._preview_rect is not None:
+            rx0, ry0, rx1, ry1 = self._preview_rect
+            buffer[ry0:ry1, rx0:rx1, :3] = self.current_image[ry0:ry1, rx0:rx1, :3]
+            self._preview_rect = None
+        if patch is not None:
+            h, w = patch.shape[:2]
+            buffer[y0:y0 + h, x0:x0 + w, :3] = patch[:, :, :3]
+            self._preview_rect = (x0, y0, x0 + w, y0 + h)
+        return buffer
+
     def _adjust_window_size(self, image_width: int, image_height: int):
         """
         Ajusta el tamaño de la ventana según la imagen actual.
@@ -520,6 +922,11 @@ class PositionEditor(QDialog):
             EXTRA_PADDING                 # Padding extra
         )
 
+        # Con el mismo ancho (misma página o mismo tamaño) no hace falta pedir
+        # otra geometría al sistema de ventanas
+        if new_window_width == self.width():
+            return
+
         # El alto se mantiene fijo (basado en el tamaño del panel de controles)
         # No se usa image_height porque solo queremos ajustar el ancho
         current_height = self.height()
@@ -543,6 +950,7 @@ class PositionEditor(QDialog):
             'side_y': self.side_y
         }
         self.saved_positions.append(position_data)
+        self._save_progress()
 
         if self.current_image_index < len(self.image_files) - 1:
             self.current_image_index += 1
@@ -559,25 +967,105 @@ class PositionEditor(QDialog):
             )
             self.accept()
 
+    def _positions_dict(self) -> dict:
+        """Retorna las posiciones guardadas como {'pos_1': {...}, 'pos_2': {...}}"""
+        positions_dict = {}
+        for i, pos_data in enumerate(self.saved_positions, start=1):
+            positions_dict[f'pos_{i}'] = dict(pos_data)
+        return positions_dict
+
+    def _partial_json_path(self) -> Path:
+        """Ruta del JSON donde se guarda el progreso de las carpetas sin terminar"""
+        return Path(os.path.dirname(current_dir)) / 'wm_positions.partial.json'
+
+    def _save_progress(self):
+        """Programa la escritura del progreso (a lo sumo una cada PROGRESS_SAVE_MS)"""
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+
+    def _flush_progress(self):
+        """Escribe en segundo plano el progreso actual en wm_positions.partial.json"""
+        self._progress_timer.stop()
+        if not self.watermarks_folder or not self.images_folder or not self.saved_positions:
+            return
+        # Se guarda también la carpeta de imágenes: las posiciones son por índice
+        # de imagen y solo se pueden retomar sobre la misma carpeta
+        progress = {
+            'images_folder': str(self.images_folder),
+            'positions': self._positions_dict()
+        }
+        self._save_pool.start(
+            SavePositionsTask(self._partial_json_path(), self.watermarks_folder.name, progress)
+        )
+
+    def _offer_resume(self):
+        """
+        Ofrece retomar la carpeta desde wm_positions.partial.json
+
+        Solo al empezar (sin posiciones guardadas) y una vez por combinación de
+        carpetas; el progreso tiene que ser de esta misma carpeta de imágenes.
+        """
+        folders = (self.images_folder, self.watermarks_folder)
+        if self.saved_positions or self._resume_checked == folders:
+            return
+        self._resume_checked = folders
+
+        progress = UtilJson(self._partial_json_path()).get(self.watermarks_folder.name)
+        if not isinstance(progress, dict) or progress.get('images_folder') != str(self.images_folder):
+            return
+        positions = list(progress.get('positions', {}).values())
+        if not positions or len(positions) >= len(self.image_files):
+            return
+
+        answer = QMessageBox.question(
+            self, "Retomar progreso",
+            f"Hay {len(positions)} posiciones guardadas de una sesión anterior para "
+            f"'{self.watermarks_folder.name}'.\n¿Continuar desde la imagen {len(positions) + 1}?"
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        self.saved_positions = [dict(pos_data) for pos_data in positions]
+        self.current_image_index = len(positions)
+        self._update_counter()
+
+        # La posición se mantiene entre imágenes: partir de la última guardada
+        last = positions[-1]
+        self.side_x_combo.setCurrentIndex(max(0, self.side_x_combo.findData(last.get('side_x', 'left'))))
+        self.side_y_combo.setCurrentIndex(max(0, self.side_y_combo.findData(last.get('side_y', 'top'))))
+        self.offset_x_spin.setValue(last.get('offset_x', 0))
+        self.offset_y_spin.setValue(last.get('offset_y', 0))
+
+    def done(self, result):
+        """Al cerrar sin terminar la carpeta, escribe el progreso que quedó programado"""
+        if self._progress_timer.isActive():
+            self._flush_progress()
+        super().done(result)
+
     def _save_to_json(self):
         """Guarda en JSON"""
         if not self.watermarks_folder or not self.saved_positions:
             return
 
+        # El archivo completo reemplaza al progreso: descartar la escritura
+        # programada y esperar a la que esté en curso
+        self._progress_timer.stop()
+        self._save_pool.waitForDone()
+
         try:
             watermark_folder_name = self.watermarks_folder.name
             wm_dir = os.path.dirname(current_dir)
             json_path = Path(wm_dir) / 'wm_positions.json'
 
             json_file = UtilJson(json_path)
-
-            positions_dict = {}
-            for i, pos_data in enumerate(self.saved_positions, start=1):
-                positions_dict[f'pos_{i}'] = pos_data
-
-            json_file.set(watermark_folder_name, positions_dict)
+            json_file.set(watermark_folder_name, self._positions_dict())
             print(f"✓ Guardadas {len(self.saved_positions)} posiciones en '{watermark_folder_name}'")
 
+            # La carpeta quedó completa: su progreso parcial ya no hace falta
+            partial_file = UtilJson(self._partial_json_path())
+            if partial_file.exists(watermark_folder_name):
+                partial_file.delete(watermark_folder_name)
+
         except Exception as e:
             QMessageBox.critical(self, "Error al guardar", f"No se pudieron guardar las posiciones:\n{str(e)}")
 
@@ -9,8 +9,12 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QWidget, QGridLayout,
     QScrollArea, QComboBox, QGroupBox, QCheckBox, QDoubleSpinBox
 )
-from PySide6.QtCore import Qt, Signal, QTimer, QPropertyAnimation, QRect, QEvent, QPoint
-from PySide6.QtGui import QPixmap, QKeyEvent, QWheelEvent, QPainter, QPen, QColor, QMouseEvent, QImage
+from PySide6.QtCore import (
+    Qt, Signal, QTimer, QPropertyAnimation, QRect, QEvent, QPoint, QThreadPool
+)
+from PySide6.QtGui import (
+    QPixmap, QKeyEvent, QWheelEvent, QPainter, QPen, QColor, QMouseEvent, QImage, QPixmapCache
+)
 
 # Agregar el directorio raíz al path
 current_dir = os.path.abspath(os.path.dirname(__file__))
@@ -23,6 +27,76 @@ import numpy as np
 from natsort import natsorted
 from WatermarkRemove import align_watermark, remove_watermark
 from WatermarkRemove.wm_remove import load_images_cv2, guardar, find_wm
+from .decode_tasks import DecodeSignals, DecodeTask, load_watermark_cached
+
+
+class SlideshowImageLabel(QLabel):
+    """Label que pinta la página con el zoom aplicado y los cuadros de posiciones encima"""
+
+    SMOOTH_DELAY_MS = 150  # Inactividad tras el último cambio de zoom antes del escalado suave
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.zoom_level = 100
+        self.original_pixmap = None  # Pixmap a resolución original; se escala al pintar
+        self.overlays = []  # (QRect escalado, color del borde, color de relleno, nombre)
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setStyleSheet("background-color: #2b2b2b;")
+
+        # Mientras la rueda sigue cambiando el zoom se pinta con escalado rápido;
+        # el suave se usa cuando el zoom deja de cambiar
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(self.SMOOTH_DELAY_MS)
+        self._smooth_timer.timeout.connect(self.update)
+
+    def set_image(self, pixmap: QPixmap, zoom_level: int, overlays: list):
+        """
+        Establece la página, el zoom y los cuadros a dibujar (pixmap None la quita para mostrar texto)
+
+        La página no se re-escala en Python: paintEvent la dibuja escalada y solo
+        en la región visible del scroll.
+        """
+        if pixmap is not None and zoom_level != self.zoom_level:
+            self._smooth_timer.start()
+        self.original_pixmap = pixmap
+        self.zoom_level = zoom_level
+        self.overlays = overlays
+
+        # El label mide lo mismo que la imagen escalada para que funcione el scroll
+        if pixmap is not None:
+            if self.text():
+                self.clear()  # Quitar un mensaje de error anterior
+            new_size = pixmap.size() * (zoom_level / 100.0)
+            if new_size != self.size():
+                self.resize(new_size)
+        self.update()
+
+    def paintEvent(self, event):
+        """Pinta la imagen escalada al tamaño del label y los cuadros encima"""
+        super().paintEvent(event)
+        if self.original_pixmap is None:
+            return
+
+        painter = QPainter(self)
+        # La imagen ocupa todo el label, pero el borde del estilo queda encima
+        painter.setClipRect(self.contentsRect())
+        if self.zoom_level != 100 and not self._smooth_timer.isActive():
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(self.rect(), self.original_pixmap, self.original_pixmap.rect())
+
+        for rect, pen_color, brush_color, name in self.overlays:
+            pen = QPen(pen_color)
+            pen.setWidth(3)
+            painter.setPen(pen)
+            painter.setBrush(brush_color)
+            painter.drawRect(rect)
+
+            # Nombre de la posición en blanco
+            painter.setPen(QPen(QColor(255, 255, 255, 255)))
+            painter.drawText(rect.x() + 5, rect.y() + 15, name)
+        painter.end()
+
 
 class SlideshowViewer(QDialog):
     """
@@ -48,6 +122,9 @@ class SlideshowViewer(QDialog):
     review_completed = Signal(bool)  # True = continuar, False = cancelar
 
     SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tiff', '.tga', '.psd', '.psb', '.jfif')
+    PREFETCH_AHEAD = 2  # Imágenes siguientes que se decodifican por adelantado
+    PREFETCH_BEHIND = 1  # Imágenes anteriores (para volver con Backspace)
+    PIXMAP_CACHE_KB = 128 * 1024  # Límite mínimo de QPixmapCache (LRU) para las páginas ya vistas
 
     def __init__(self, folder_path: str, parent=None, watermark_folder: str = None, watermark_name: str = None, watermark_tab=None):
         super().__init__(parent)
@@ -56,6 +133,7 @@ class SlideshowViewer(QDialog):
         self.current_index = 0
         self.user_approved = False
         self.current_pixmap = None  # Pixmap original sin zoom
+        self._pixmap_source = None  # Array a partir del cual se creó current_pixmap
         self.zoom_level = 100  # Nivel de zoom actual
         self.controls_panel_width = 280  # Ancho del panel de controles para cálculos
 
@@ -92,6 +170,16 @@ class SlideshowViewer(QDialog):
         # Alpha por marca de agua (índice -> valor alpha)
         self.watermark_alpha_values: dict = {}  # {0: 1.0, 1: 1.5, ...}
 
+        # Precarga de las imágenes vecinas en segundo plano
+        self._prefetched = {}  # ruta -> ndarray ya decodificado
+        self._prefetching = set()  # Rutas con decodificación en curso
+        self._decode_signals = DecodeSignals()
+        self._decode_signals.finished.connect(self._on_image_decoded)
+
+        # Las páginas sin editar se guardan ya convertidas a QPixmap; la caché es
+        # global, así que solo se agranda (ImageViewer también la usa)
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), self.PIXMAP_CACHE_KB))
+
         self._setup_ui()
         self._load_image_list()
 
@@ -295,9 +383,7 @@ class SlideshowViewer(QDialog):
         scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         scroll.setStyleSheet("border: 2px solid #444; background-color: #2b2b2b;")
 
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label.setStyleSheet("background-color: #2b2b2b;")
+        self.image_label = SlideshowImageLabel()
         scroll.setWidget(self.image_label)
 
         # Label flotante de zoom (encima de la imagen)
@@ -357,10 +443,15 @@ class SlideshowViewer(QDialog):
         if self.folder_path.is_file():
             self.folder_path = self.folder_path.parent
 
-        # Buscar todas las imágenes y ordenarlas
-        for file in natsorted(self.folder_path.iterdir()):
-            if file.is_file() and file.suffix.lower() in self.SUPPORTED_FORMATS:
-                self.image_files.append(file)
+        # Buscar todas las imágenes y ordenarlas; os.scandir reutiliza el tipo de
+        # archivo que entrega el sistema al listar, sin un stat por archivo
+        with os.scandir(self.folder_path) as it:
+            entries = [
+                entry for entry in it
+                if entry.is_file(follow_symlinks=False)
+                and entry.name.lower().endswith(self.SUPPORTED_FORMATS)
+            ]
+        self.image_files = [Path(entry.path) for entry in natsorted(entries, key=lambda entry: entry.name)]
 
         self._update_counter()
 
@@ -379,12 +470,13 @@ class SlideshowViewer(QDialog):
             return
 
         # Obtener subcarpetas ordenadas (más recientes primero)
-        folders = [f for f in marcas_base_path.iterdir() if f.is_dir()]
-        folders.sort(reverse=True)
+        with os.scandir(marcas_base_path) as it:
+            folders = [entry for entry in it if entry.is_dir()]
+        folders.sort(key=lambda entry: entry.name, reverse=True)
 
         # Agregar al combo: label = nombre, data = ruta completa
         for folder in folders:
-            self.watermark_folder_combo.addItem(folder.name, str(folder))
+            self.watermark_folder_combo.addItem(folder.name, folder.path)
 
         # Determinar qué carpeta seleccionar
         if self.watermark_folder:
@@ -415,6 +507,7 @@ class SlideshowViewer(QDialog):
         if folder_path:
             self.watermark_folder = Path(folder_path)
             self.watermark_name = folder_name  # Actualizar el nombre
+            load_watermark_cached.cache_clear()
             self._load_watermarks_into_combo()
             self._load_watermark_positions()
 
@@ -437,11 +530,10 @@ class SlideshowViewer(QDialog):
             return
 
         # Cargar todos los archivos PNG de la carpeta
-        for file in natsorted(self.watermark_folder.iterdir()):
-            if file.is_file() and file.suffix.lower() == '.png':
-                self.watermark_files.append(file)
-                # Agregar al ComboBox: nombre del archivo como label, ruta como data
-                self.watermark_combo.addItem(file.name, str(file))
+        for file in self._scan_watermark_files():
+            self.watermark_files.append(file)
+            # Agregar al ComboBox: nombre del archivo como label, ruta como data
+            self.watermark_combo.addItem(file.name, str(file))
 
     def _on_watermark_changed(self, index):
         """Callback cuando cambia la marca individual seleccionada"""
@@ -460,10 +552,16 @@ class SlideshowViewer(QDialog):
         if not self.watermark_folder or not self.watermark_folder.exists():
             return
 
-        self.watermark_files = []
-        for file in natsorted(self.watermark_folder.iterdir()):
-            if file.is_file() and file.suffix.lower() == '.png':
-                self.watermark_files.append(file)
+        self.watermark_files = self._scan_watermark_files()
+
+    def _scan_watermark_files(self) -> list:
+        """Retorna los PNG de la carpeta de marcas en orden natural (un solo os.scandir)"""
+        with os.scandir(self.watermark_folder) as it:
+            entries = [
+                entry for entry in it
+                if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith('.png')
+            ]
+        return [Path(entry.path) for entry in natsorted(entries, key=lambda entry: entry.name)]
 
     def _load_watermark_positions(self):
         """Carga las posiciones de marcas de agua desde wm_positions.json"""
@@ -500,16 +598,31 @@ class SlideshowViewer(QDialog):
         current_file = self.image_files[self.current_index]
 
         # Cargar working_image SOLO si no existe (primera vez en esta imagen)
-        if self.working_image is None:
-            self.working_image = load_images_cv2(current_file)
-
-        # Convertir working_image a QPixmap para mostrar
+        fresh = self.working_image is None
+        if fresh:
+            # Soltar el pixmap de la página anterior (lo comparte el label) antes
+            # de decodificar esta; si no está en QPixmapCache se libera ya
+            self.current_pixmap = None
+            self.image_label.set_image(None, self.zoom_level, [])
+            image = self._prefetched.pop(str(current_file), None)
+            self.working_image = image if image is not None else load_images_cv2(current_file)
+
+        # Mientras se revisa esta imagen, decodificar las vecinas
+        self._prefetch_neighbors()
+
+        # Convertir working_image a QPixmap para mostrar (solo si cambió); una
+        # página recién cargada es la original, así que al volver a ella con
+        # Backspace su pixmap sale de QPixmapCache
         if self.working_image is not None:
-            height, width = self.working_image.shape[:2]
-            bytes_per_line = 3 * width
-            q_image = QImage(self.working_image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-            q_image = q_image.rgbSwapped()  # OpenCV usa BGR, Qt usa RGB
-            self.current_pixmap = QPixmap.fromImage(q_image)
+            if self.working_image is not self._pixmap_source:
+                cache_key = self._pixmap_cache_key(current_file) if fresh else None
+                pixmap = QPixmapCache.find(cache_key) if cache_key else None
+                if pixmap is None:
+                    pixmap = self._array_to_pixmap(self.working_image)
+                    if cache_key:
+                        QPixmapCache.insert(cache_key, pixmap)
+                self.current_pixmap = pixmap
+                self._pixmap_source = self.working_image
         else:
             # Fallback a cargar desde disco si working_image falla
             self.current_pixmap = QPixmap(str(current_file))
@@ -523,6 +636,7 @@ class SlideshowViewer(QDialog):
             height = self.current_pixmap.height()
             self._adjust_window_size(width, height)
         else:
+            self.image_label.set_image(None, self.zoom_level, [])
             self.image_label.setText("Error cargando imagen")
 
         # Actualizar nombre de archivo
@@ -535,62 +649,100 @@ class SlideshowViewer(QDialog):
         self.prev_btn.setEnabled(self.current_index > 0)
         self.next_btn.setEnabled(self.current_index < len(self.image_files) - 1)
 
+    def _pixmap_cache_key(self, image_path: Path) -> Optional[str]:
+        """
+        Clave de QPixmapCache para una página (None si no se puede leer el archivo)
+
+        La caché es global y sobrevive al diálogo: la clave incluye la fecha de
+        modificación y el tamaño, así que una página sobrescrita con el mismo
+        nombre no muestra el pixmap viejo mientras se procesa la nueva.
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return f"slideshow:{image_path}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def _prefetch_window(self) -> set:
+        """Rutas de las imágenes vecinas a la actual que se mantienen precargadas"""
+        start = max(0, self.current_index - self.PREFETCH_BEHIND)
+        end = self.current_index + 1 + self.PREFETCH_AHEAD
+        return {
+            str(path) for index, path in enumerate(self.image_files[start:end], start=start)
+            if index != self.current_index
+        }
+
+    def _prefetch_neighbors(self):
+        """Encola la decodificación de las vecinas y descarta las que quedaron lejos"""
+        window = self._prefetch_window()
+        for path in list(self._prefetched):
+            if path not in window:
+                del self._prefetched[path]
+        for path in window:
+            if path not in self._prefetched and path not in self._prefetching:
+                self._prefetching.add(path)
+                QThreadPool.globalInstance().start(DecodeTask(path, self._decode_signals))
+
+    def _on_image_decoded(self, image_path: str, image):
+        """Guarda la imagen precargada si sigue siendo vecina de la actual (hilo de la GUI)"""
+        self._prefetching.discard(image_path)
+        if image is not None and image_path in self._prefetch_window():
+            self._prefetched[image_path] = image
+
+    def _array_to_pixmap(self, image: np.ndarray) -> QPixmap:
+        """Convierte un array BGR de OpenCV a QPixmap"""
+        # Qt lee el buffer BGR directamente (sin rgbSwapped, que copiaba la
+        # imagen entera); fromImage copia los píxeles, así que el array no
+        # tiene que sobrevivir al QImage. QImage necesita filas contiguas
+        if not image.flags['C_CONTIGUOUS']:
+            image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        q_image = QImage(image.data, width, height, image.strides[0], QImage.Format.Format_BGR888)
+        return QPixmap.fromImage(q_image)
+
     def _apply_zoom(self):
         """Aplica el nivel de zoom actual a la imagen y dibuja overlays de marcas"""
         # Prioridad: preview_image (sub-evento activo) > working_image (imagen editada) > current_pixmap
         if self.is_preview_active and self.preview_image is not None:
             # Mostrar preview del sub-evento
-            height, width = self.preview_image.shape[:2]
-            bytes_per_line = 3 * width
-            q_image = QImage(self.preview_image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-            q_image = q_image.rgbSwapped()  # OpenCV usa BGR, Qt usa RGB
-            pixmap_to_scale = QPixmap.fromImage(q_image)
+            pixmap_to_scale = self._array_to_pixmap(self.preview_image)
         elif self.working_image is not None:
-            # Mostrar imagen de trabajo (con sub-eventos previos aplicados)
-            height, width = self.working_image.shape[:2]
-            bytes_per_line = 3 * width
-            q_image = QImage(self.working_image.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-            q_image = q_image.rgbSwapped()  # OpenCV usa BGR, Qt usa RGB
-            pixmap_to_scale = QPixmap.fromImage(q_image)
+            # Mostrar imagen de trabajo (con sub-eventos previos aplicados); solo
+            # se vuelve a convertir si cambió desde la última vez
+            if self.working_image is not self._pixmap_source:
+                self.current_pixmap = self._array_to_pixmap(self.working_image)
+                self._pixmap_source = self.working_image
+            pixmap_to_scale = self.current_pixmap
         else:
             # Fallback a pixmap original
             if self.current_pixmap is None or self.current_pixmap.isNull():
                 return
             pixmap_to_scale = self.current_pixmap
 
-        # Calcular nuevo tamaño basado en zoom
+        # El label escala la imagen al pintar; aquí solo se calculan los cuadros
         scale_factor = self.zoom_level / 100.0
-        new_size = pixmap_to_scale.size() * scale_factor
-
-        # Escalar imagen
-        scaled_pixmap = pixmap_to_scale.scaled(
-            new_size,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
+        overlays = []
 
         # Si hay posiciones de marcas de agua y NO estamos en modo manual, dibujar overlays
         if self.watermark_positions and self.watermark_files and not self.manual_mode_enabled:
-            scaled_pixmap = self._draw_watermark_overlays(scaled_pixmap, scale_factor)
+            overlays = self._build_watermark_overlays(scale_factor)
 
-        self.image_label.setPixmap(scaled_pixmap)
-        # Ajustar el tamaño del label para que funcione el scroll
-        self.image_label.resize(scaled_pixmap.size())
+        self.image_label.set_image(pixmap_to_scale, self.zoom_level, overlays)
 
-    def _draw_watermark_overlays(self, pixmap: QPixmap, scale_factor: float) -> QPixmap:
+    def _build_watermark_overlays(self, scale_factor: float) -> list:
         """
-        Dibuja cuadrados semi-transparentes sobre el pixmap indicando las posiciones de las marcas de agua.
+        Calcula los cuadrados semi-transparentes que indican las posiciones de las marcas de agua.
+
+        También actualiza watermark_rectangles para la detección de clicks. El
+        label los dibuja sobre la imagen escalada al pintar.
 
         Args:
-            pixmap: El pixmap escalado de la imagen
             scale_factor: Factor de escala actual (zoom_level / 100)
 
         Returns:
-            QPixmap con los cuadrados dibujados
+            list: (QRect escalado, color del borde, color de relleno, nombre) por posición
         """
-        # Crear una copia del pixmap para dibujar encima
-        result_pixmap = QPixmap(pixmap)
-        painter = QPainter(result_pixmap)
+        overlays = []
 
         # Limpiar el diccionario de rectángulos para la nueva imagen
         self.watermark_rectangles = {}
@@ -604,16 +756,14 @@ class SlideshowViewer(QDialog):
 
             # Si no hay marca seleccionada o no hay archivos, no dibujar nada
             if current_watermark_index < 0 or not self.watermark_files:
-                painter.end()
-                return result_pixmap
+                return overlays
 
             # Cargar la marca de agua actual para obtener sus dimensiones
             watermark_file = self.watermark_files[current_watermark_index]
-            watermark_cv = load_images_cv2(watermark_file)
+            watermark_cv = load_watermark_cached(str(watermark_file))
 
             if watermark_cv is None:
-                painter.end()
-                return result_pixmap
+                return overlays
 
             wm_height, wm_width = watermark_cv.shape[:2]
 
@@ -675,24 +825,14 @@ class SlideshowViewer(QDialog):
                     pen_color = QColor(255, 0, 0, 200)
                     brush_color = QColor(255, 0, 0, 50)
 
-                pen = QPen(pen_color)
-                pen.setWidth(3)
-                painter.setPen(pen)
-                painter.setBrush(brush_color)
-
-                # Dibujar el rectángulo
-                painter.drawRect(scaled_x, scaled_y, scaled_width, scaled_height)
-
-                # Opcional: Dibujar el nombre de la posición
-                painter.setPen(QPen(QColor(255, 255, 255, 255)))  # Texto blanco
-                painter.drawText(scaled_x + 5, scaled_y + 15, pos_name)
+                overlays.append((
+                    self.watermark_rectangles[pos_name]['scaled_rect'], pen_color, brush_color, pos_name
+                ))
 
         except Exception as e:
             self._log(f"⚠️ Error dibujando overlays: {e}")
-        finally:
-            painter.end()
 
-        return result_pixmap
+        return overlays
 
     def _set_zoom(self, new_zoom: int):
         """Establece el nivel de zoom y actualiza la visualización"""
@@ -745,6 +885,11 @@ class SlideshowViewer(QDialog):
             EXTRA_PADDING                 # Padding extra
         )
 
+        # Con el mismo ancho (misma página o mismo tamaño) no hace falta pedir
+        # otra geometría al sistema de ventanas
+        if new_window_width == self.width():
+            return
+
         # El alto se mantiene fijo (basado en el tamaño del panel de controles)
         # No se usa image_height porque solo queremos ajustar el ancho
         current_height = self.height()
@@ -764,6 +909,7 @@ class SlideshowViewer(QDialog):
     def _clear_image_memory(self):
         """Limpia la imagen de memoria cuando se navega a otra imagen"""
         self.working_image = None  # Limpiar imagen de trabajo
+        self._pixmap_source = None
         self.base_image_for_preview = None
         self.current_event_position = None
         self.current_event_watermark_index = None
@@ -861,7 +1007,7 @@ class SlideshowViewer(QDialog):
 
             # Cargar la marca de agua
             watermark_file = self.watermark_files[current_watermark_index]
-            watermark = load_images_cv2(watermark_file)
+            watermark = load_watermark_cached(str(watermark_file))
             if watermark is None:
                 self._log(f"❌ Error cargando marca de agua: {watermark_file.name}")
                 return
@@ -964,7 +1110,7 @@ class SlideshowViewer(QDialog):
 
             # Cargar marca para obtener dimensiones
             watermark_file = self.watermark_files[current_watermark_index]
-            watermark_cv = load_images_cv2(watermark_file)
+            watermark_cv = load_watermark_cached(str(watermark_file))
             if watermark_cv is None:
                 return
 
@@ -1012,7 +1158,7 @@ class SlideshowViewer(QDialog):
         try:
             # Recargar marca de agua
             watermark_file = self.watermark_files[self.current_event_watermark_index]
-            watermark = load_images_cv2(watermark_file)
+            watermark = load_watermark_cached(str(watermark_file))
 
             # Recalcular preview desde la base con nuevo alpha
             best_x, best_y = self.current_event_position
@@ -1061,7 +1207,7 @@ class SlideshowViewer(QDialog):
 
             # Cargar marca de agua
             watermark_file = self.watermark_files[current_watermark_index]
-            watermark = load_images_cv2(watermark_file)
+            watermark = load_watermark_cached(str(watermark_file))
             if watermark is None:
                 self._log(f"❌ Error cargando marca de agua: {watermark_file.name}")
                 return
@@ -300,8 +300,9 @@ def remove_watermark(
     h_img, w_img = image.shape[:2]
     h_wm, w_wm = watermark.shape[:2]
     
-    # Si hay desplazamiento subpíxel, trasladar la marca de agua
-    wm_translated = watermark.copy()
+    # Si hay desplazamiento subpíxel, trasladar la marca de agua (solo se lee,
+    # así que sin desplazamiento no hace falta copiarla)
+    wm_translated = watermark
     if x_sub != 0 or y_sub != 0:
         M = np.float32([[1, 0, x_sub], [0, 1, y_sub]])
         wm_translated = cv2.warpAffine(
@@ -325,49 +326,45 @@ def remove_watermark(
     if x_start_img >= x_end_img or y_start_img >= y_end_img:
         return image
     
-    # Copiar imagen para no modificar el original
-    result = image.copy().astype(np.float32)
+    # Copiar imagen para no modificar el original; solo la región de la marca
+    # se pasa a float32 (convertir la imagen entera costaba 4 veces su tamaño)
+    result = image.copy()
     
     # Extraer región de interés
-    roi = result[y_start_img:y_end_img, x_start_img:x_end_img]
+    roi = result[y_start_img:y_end_img, x_start_img:x_end_img].astype(np.float32)
     wm_cropped = wm_translated[y_start_wm:y_end_wm, x_start_wm:x_end_wm].astype(np.float32)
     
     # Extraer canal alfa y aplicar ajuste
-    alpha = wm_cropped[:, :, 3].copy()
-    alpha = np.clip(alpha * alpha_adjust, 0, 255)
-    
-    h, w = roi.shape[:2]
-    
-    # Aplicar la fórmula de Fire píxel por píxel (como en JS)
-    for i in range(h):
-        for j in range(w):
-            alpha_val = alpha[i, j]
-            
-            # Solo procesar si supera el umbral de transparencia
-            if alpha_val > transparency_threshold:
-                # Fórmula de Fire
-                alpha_img = 255.0 / (255.0 - alpha_val)
-                alpha_wm = -alpha_val / (255.0 - alpha_val)
-                
-                # Aplicar a cada canal
-                for c in range(3):
-                    new_val = alpha_img * roi[i, j, c] + alpha_wm * wm_cropped[i, j, c]
-                    roi[i, j, c] = new_val
-                
-                # Suavizado de píxeles muy opacos
-                if alpha_val > opaque_threshold and j > 0:
-                    factor = (alpha_val - opaque_threshold) / (255.0 - opaque_threshold)
-                    for c in range(3):
-                        roi[i, j, c] = factor * roi[i, j-1, c] + (1 - factor) * roi[i, j, c]
+    alpha = np.clip(wm_cropped[:, :, 3] * alpha_adjust, 0, 255)
+    
+    # Solo procesar los píxeles que superan el umbral de transparencia
+    process = alpha > transparency_threshold
+    
+    # Aplicar la fórmula de Fire a todos los píxeles a la vez (como en JS)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha_img = 255.0 / (255.0 - alpha)
+        alpha_wm = -alpha / (255.0 - alpha)
+    new_val = alpha_img[:, :, None] * roi[:, :, :3] + alpha_wm[:, :, None] * wm_cropped[:, :, :3]
+    roi[:, :, :3] = np.where(process[:, :, None], new_val, roi[:, :, :3])
+    
+    # Suavizado de píxeles muy opacos: cada uno se mezcla con el de su izquierda
+    # ya suavizado, así que se recorre columna por columna (vectorizado en filas)
+    smooth = process & (alpha > opaque_threshold)
+    smooth[:, 0] = False
+    factor = (alpha - opaque_threshold) / (255.0 - opaque_threshold)
+    for j in np.flatnonzero(smooth.any(axis=0)):
+        rows = smooth[:, j]
+        f = factor[rows, j][:, None]
+        roi[rows, j, :3] = f * roi[rows, j - 1, :3] + (1 - f) * roi[rows, j, :3]
     
     # Clip values
     roi = np.clip(roi, 0, 255)
-    result[y_start_img:y_end_img, x_start_img:x_end_img] = roi
+    result[y_start_img:y_end_img, x_start_img:x_end_img] = roi.astype(np.uint8)
     
     # Aplicar filtro JPEG si está habilitado
     if apply_jpeg_filter:
         result = apply_jpeg_noise_filter(
-            result.astype(np.uint8),
+            result,
             alpha,
             (x_start_img, y_start_img, x_end_img, y_end_img),
             jpeg_filter_strength,
@@ -376,7 +373,7 @@ def remove_watermark(
         )
         return result
     
-    return result.astype(np.uint8)
+    return result
 
 
 def apply_jpeg_noise_filter(
@@ -394,15 +391,14 @@ def apply_jpeg_noise_filter(
     1. Aplica blur a la región procesada
     2. Solo en el área donde había marca de agua
     3. Opcionalmente aplica surface blur para preservar bordes
+
+    Modifica `image` en el sitio (remove_watermark le pasa su propia copia) y la retorna.
     """
     x_start, y_start, x_end, y_end = roi_coords
-    result = image.copy()
-    
-    h = y_end - y_start
-    w = x_end - x_start
+    result = image
     
-    # Extraer la región procesada
-    roi = result[y_start:y_end, x_start:x_end].copy().astype(np.float32)
+    # Extraer la región procesada (astype ya devuelve una copia)
+    roi = result[y_start:y_end, x_start:x_end].astype(np.float32)
     
     # 1. Crear máscara donde había marca de agua (alpha > threshold)
     watermark_mask = (watermark_alpha > transparency_threshold).astype(np.uint8) * 255
@@ -417,10 +413,7 @@ def apply_jpeg_noise_filter(
     blur_canvas = roi.copy()
     
     # 4. Aplicar la máscara: solo donde había marca de agua
-    for i in range(h):
-        for j in range(w):
-            if watermark_mask[i, j] > 0:
-                blur_canvas[i, j] = blurred[i, j]
+    np.copyto(blur_canvas, blurred, where=(watermark_mask > 0)[:, :, None])
     
     # 5. Mezclar usando composite operation 'color' (mantener luminosidad original)
     # Convertir a HSV para separar luminosidad de color
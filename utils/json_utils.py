@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 from typing import Any, Optional, Union
 
@@ -52,14 +53,19 @@ class UtilJson:
         """
         Escribe un diccionario completo en el archivo JSON (sobrescribe el contenido).
 
+        Se escribe primero a un archivo temporal y luego se reemplaza el original,
+        así un cierre inesperado nunca deja el JSON a medio escribir.
+
         Args:
             data: Diccionario a guardar
 
         Returns:
             self: Para permitir encadenamiento de métodos
         """
-        with open(self.path, 'w', encoding=self.encoding) as archivo:
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding=self.encoding) as archivo:
             json.dump(data, archivo, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        os.replace(tmp_path, self.path)
         return self
 
     def update(self, data: dict) -> 'UtilJson':